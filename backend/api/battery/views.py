@@ -4,9 +4,9 @@ from typing import Tuple
 import ast
 
 from backend.api import check_request_credentials
-from backend.api.common import get_loads
+from backend.api.common import get_battery_series, get_loads, get_loads_series, stream_battery_series
 from backend.configs import TIMEZONE
-from backend.database import func
+from backend.database import on_day
 from backend.extensions.blueprints import battery
 from backend.models import (
     BatteryDetails,
@@ -22,12 +22,13 @@ from backend.serializers import (
     ResultSchema,
     BatterySchema,
 )
+from backend.serializers.load import DEFAULT_DATETIME_FORMAT
 from backend.tasks.utils import calculate_pcs_battery_consumption
 from backend.utils import tznow
 from dateutil import parser, tz
-from flask import abort, jsonify, request
+from flask import abort, jsonify, request, stream_with_context
 from werkzeug.wrappers import Response
-from backend.api.validators import validate_create_battery, validate_edit_battery, validate_delete_battery_loads, validate_put_battery_loads
+from backend.api.validators import validate_create_battery, validate_edit_battery, validate_delete_battery_loads, validate_put_battery_loads, validate_get_battery_range
 from backend.database import session
 
 tzfile = tz.gettz(TIMEZONE)
@@ -119,7 +120,7 @@ def get_pcs_battery_consumption():
         else tznow(TIMEZONE).date()
     )
     results = (
-        Result.filter(func.date(Result.datetime) == date)
+        Result.filter(on_day(Result.datetime, date))
         .order_by(Result.datetime)
         .all()
     )
@@ -134,6 +135,59 @@ def get_pcs_battery_consumption():
     )
 
 
+@battery.route("/PCS/consumption/range", methods=["GET"])
+def get_pcs_battery_consumption_range():
+    """
+    Get the battery consumption of the PCS between two dates.
+
+    Parameters
+    ----------
+    start: str(date)
+        The first day of the range, only dates with %Y-%m-%d format are acceptable.
+    end: str(date)
+        The last day of the range (included), by default today.
+    battery_id: int (repeatable)
+        Only return the values of these batteries, by default all of them.
+    resolution: str
+        The bucket size ("hour", "day" or "week"), by default "hour". The value of a
+        bucket is the average of its values. The buckets are made by ``date_trunc``,
+        so this endpoint only works on PostgreSQL.
+
+    Returns
+    -------
+    responses: dict
+      200:
+        description: The values of each battery (streamed), grouped by battery id
+        schema:
+          result:
+            <battery_id>: array
+              datetime: str(datetime)
+              power: float
+              soc: float
+              utility_power: float
+      400:
+        description: Invalid range
+    """
+
+    if not check_request_credentials(request, require_admin_privilege=False):
+        return abort(HTTPStatus.UNAUTHORIZED)  # Authorization failed
+
+    params = validate_get_battery_range()
+    fields = ("power", "soc", "utility_power")
+    rows = get_battery_series(
+        Result.query,
+        Result.datetime,
+        Result.battery_id,
+        {field: getattr(Result, field) for field in fields},
+        params["start"],
+        params["end"],
+        battery_ids=params["battery_id"],
+        resolution=params["resolution"],
+    )
+
+    return Response(stream_with_context(stream_battery_series(rows, fields)), mimetype="application/json")
+
+
 @battery.route("/PCS/load", methods=["GET"])
 def get_battery_load():
     """
@@ -166,10 +220,59 @@ def get_battery_load():
         else tznow(TIMEZONE).date()
     )
 
-    results = get_loads(date=date)
+    results = [
+        {"datetime": row.datetime.strftime(DEFAULT_DATETIME_FORMAT), "value": row.value}
+        for row in get_loads(date=date)
+    ]
     return jsonify(result=results), HTTPStatus.OK
 
 
+@battery.route("/PCS/load/range", methods=["GET"])
+def get_battery_load_range():
+    """
+    Get the battery load of the PCS between two dates (manual_load is preferred over the load).
+
+    Parameters
+    ----------
+    start: str(date)
+        The first day of the range, only dates with %Y-%m-%d format are acceptable.
+    end: str(date)
+        The last day of the range (included), by default today.
+    battery_id: int (repeatable)
+        Only return the values of these batteries, by default all of them.
+    resolution: str
+        The bucket size ("hour", "day" or "week"), by default "hour". The value of a
+        bucket is the average of its values. The buckets are made by ``date_trunc``,
+        so this endpoint only works on PostgreSQL.
+
+    Returns
+    -------
+    responses: dict
+      200:
+        description: The values of each battery (streamed), grouped by battery id
+        schema:
+          result:
+            <battery_id>: array
+              datetime: str(datetime)
+              value: float
+      400:
+        description: Invalid range
+    """
+
+    if not check_request_credentials(request, require_admin_privilege=False):
+        return abort(HTTPStatus.UNAUTHORIZED)  # Authorization failed
+
+    params = validate_get_battery_range()
+    rows = get_loads_series(
+        params["start"],
+        params["end"],
+        battery_ids=params["battery_id"],
+        resolution=params["resolution"],
+    )
+
+    return Response(stream_with_context(stream_battery_series(rows, ("value",))), mimetype="application/json")
+
+
 @battery.route("/PCS/details", methods=["GET"])
 def get_battery_details():
     """
@@ -252,7 +355,7 @@ def get_voltage_current():
         else tznow(TIMEZONE).date()
     )
     results = (
-        PowerQuality.filter(func.date(PowerQuality.datetime) == query_date)
+        PowerQuality.filter(on_day(PowerQuality.datetime, query_date))
         .order_by(PowerQuality.datetime)
         .all()
     )
@@ -263,6 +366,69 @@ def get_voltage_current():
         return jsonify({"message": "No voltage current data found"}), 404
 
 
+@battery.route("/PCS/voltage_current/range", methods=["GET"])
+def get_voltage_current_range():
+    """
+    Get the voltage and current of the PCS between two dates.
+
+    Parameters
+    ----------
+    start: str(date)
+        The first day of the range, only dates with %Y-%m-%d format are acceptable.
+    end: str(date)
+        The last day of the range (included), by default today.
+    battery_id: int (repeatable)
+        Only return the values of these batteries, by default all of them.
+    resolution: str
+        The bucket size ("hour", "day" or "week"), by default "hour". The value of a
+        bucket is the average of its values. The buckets are made by ``date_trunc``,
+        so this endpoint only works on PostgreSQL.
+
+    Returns
+    -------
+    responses: dict
+      200:
+        description: The values of each battery (streamed), grouped by battery id
+        schema:
+          result:
+            <battery_id>: array
+              datetime: str(datetime)
+              voltage_utility: float
+              voltage_battery: float
+              voltage_facility: float
+              current_utility: float
+              current_battery: float
+              current_facility: float
+      400:
+        description: Invalid range
+    """
+
+    if not check_request_credentials(request, require_admin_privilege=False):
+        return abort(HTTPStatus.UNAUTHORIZED)  # Authorization failed
+
+    params = validate_get_battery_range()
+    fields = (
+        "voltage_utility",
+        "voltage_battery",
+        "voltage_facility",
+        "current_utility",
+        "current_battery",
+        "current_facility",
+    )
+    rows = get_battery_series(
+        PowerQuality.query,
+        PowerQuality.datetime,
+        PowerQuality.battery_id,
+        {field: getattr(PowerQuality, field) for field in fields},
+        params["start"],
+        params["end"],
+        battery_ids=params["battery_id"],
+        resolution=params["resolution"],
+    )
+
+    return Response(stream_with_context(stream_battery_series(rows, fields)), mimetype="application/json")
+
+
 @battery.route("/PCS/power_flow", methods=["GET"])
 def get_power_flow_battery():
     """
@@ -370,7 +536,7 @@ def delete_battery_load() -> Tuple[Response, HTTPStatus]:
     params = validate_delete_battery_loads()
 
     stmt = ManualLoad.__table__.delete().where(
-        ManualLoad.component_id == params['component_id'], func.date(ManualLoad.datetime) == params['date'].date())
+        ManualLoad.component_id == params['component_id'], on_day(ManualLoad.datetime, params['date'].date()))
 
     session.execute(statement=stmt)
     session.commit()
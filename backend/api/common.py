@@ -1,34 +1,173 @@
 import datetime
+import itertools
+import json
 
-from backend.database import func
-from backend.models import Load, ManualLoad
-from backend.serializers import LoadSchema, ManualLoadSchema
+from backend.configs import RANGE_BATCH_SIZE
+from backend.database import func, on_day, on_days, session
+from backend.models import Battery, Load, ManualLoad
+from backend.serializers.load import DEFAULT_DATETIME_FORMAT
+from sqlalchemy import and_
+from sqlalchemy.orm import Query
 
 
-def get_loads(date: datetime.date) -> list:
-    """Return the load object of the given date.
+def get_loads(date: datetime.date, component_id: int = None) -> list:
+    """Return the load values of the given date.
 
-    manual_load is preferred over the load.
+    manual_load is preferred over the load, they are merged by one query (a manual
+    load replaces the load of the same component at the same time).
 
     Parameters
     ----------
     date : datetime.date
         The requested date to get load values.
+    component_id : int, optional
+        Only return the load values of this component.
 
     Returns
     -------
     list
-        The load objects.
+        The (datetime, value) rows, ordered by datetime.
     """
-    load_query = (Load.filter(func.date(Load.datetime) == date).order_by(Load.datetime)).all()
-    manual_load_query = (ManualLoad.filter(func.date(ManualLoad.datetime) == date).order_by(ManualLoad.datetime)).all()
+    query = (
+        session.query(Load.datetime, func.coalesce(ManualLoad.value, Load.value).label("value"))
+        .outerjoin(
+            ManualLoad,
+            and_(ManualLoad.component_id == Load.component_id, ManualLoad.datetime == Load.datetime),
+        )
+        .filter(on_day(Load.datetime, date))
+    )
 
-    load = list(map(dict, LoadSchema(many=True).dump(load_query)))
-    manual_load = list(map(dict, ManualLoadSchema(many=True).dump(manual_load_query)))
+    if component_id is not None:
+        query = query.filter(Load.component_id == component_id)
 
-    for load_item in load:
-        for manual_load_item in manual_load:
-            if load_item["datetime"] == manual_load_item["datetime"]:
-                load_item["value"] = manual_load_item["value"]
+    return query.order_by(Load.datetime).all()
 
-    return load
+
+def get_battery_series(
+    query: Query,
+    datetime_column,
+    battery_column,
+    values: dict,
+    start: datetime.date,
+    end: datetime.date,
+    battery_ids: list = None,
+    resolution: str = "hour",
+) -> Query:
+    """Aggregate the values of the batteries by hourly, daily or weekly buckets.
+
+    The buckets are made by ``date_trunc``, so it only works on PostgreSQL.
+
+    Parameters
+    ----------
+    query : sqlalchemy.orm.Query
+        The query of the rows (with its joins).
+    datetime_column : sqlalchemy.Column
+        The datetime of the rows.
+    battery_column : sqlalchemy.Column
+        The battery id of the rows.
+    values : dict
+        The value columns (by name), a bucket has the average of each one.
+    start : datetime.date
+        The first day.
+    end : datetime.date
+        The last day (included).
+    battery_ids : list, optional
+        Only return the values of these batteries, by default all of them.
+    resolution : str, optional
+        The bucket size ("hour", "day" or "week"), by default "hour".
+
+    Returns
+    -------
+    sqlalchemy.orm.Query
+        The (battery_id, datetime, *values) rows, ordered by battery and datetime, the
+        rows are read from the database in batches.
+    """
+
+    bucket = func.date_trunc(resolution, datetime_column)
+    query = query.with_entities(
+        battery_column.label("battery_id"),
+        bucket.label("datetime"),
+        *(func.avg(column).label(name) for name, column in values.items()),
+    ).filter(on_days(datetime_column, start, end))
+
+    if battery_ids:
+        query = query.filter(battery_column.in_(battery_ids))
+
+    return query.group_by(battery_column, bucket).order_by(battery_column, bucket).yield_per(RANGE_BATCH_SIZE)
+
+
+def get_loads_series(start: datetime.date, end: datetime.date, battery_ids: list = None, resolution: str = "hour") -> Query:
+    """Return the load values of the batteries between the given dates (see ``get_loads``).
+
+    Returns
+    -------
+    sqlalchemy.orm.Query
+        The (battery_id, datetime, value) rows (see ``get_battery_series``).
+    """
+
+    query = (
+        session.query(Load)
+        .join(Battery, Battery.component_id == Load.component_id)
+        .outerjoin(
+            ManualLoad,
+            and_(ManualLoad.component_id == Load.component_id, ManualLoad.datetime == Load.datetime),
+        )
+    )
+
+    return get_battery_series(
+        query,
+        Load.datetime,
+        Battery.id,
+        {"value": func.coalesce(ManualLoad.value, Load.value)},
+        start,
+        end,
+        battery_ids=battery_ids,
+        resolution=resolution,
+    )
+
+
+def stream_battery_series(rows, fields: tuple):
+    """Write the rows of ``get_battery_series`` as JSON, grouped by battery.
+
+    The query is run (and its first batch is read) before the first chunk, so a
+    database error fails the request instead of truncating the response. Then the
+    rows are written one by one (``{"result": {"<battery_id>": [...], ...}}``), the
+    response is not built in the memory.
+
+    Parameters
+    ----------
+    rows : iterable
+        The (battery_id, datetime, *values) rows, ordered by battery.
+    fields : tuple
+        The names of the values.
+
+    Returns
+    -------
+    generator
+        The chunks of the JSON document.
+    """
+
+    rows = iter(rows)
+    first = next(rows, None)
+
+    return write_battery_series(itertools.chain([first], rows) if first is not None else (), fields)
+
+
+def write_battery_series(rows, fields: tuple):
+    """Write the rows as JSON chunks (see ``stream_battery_series``)."""
+
+    yield '{"result": {'
+
+    battery_id = None
+    for row in rows:
+        if row.battery_id != battery_id:
+            yield ("" if battery_id is None else "], ") + f'"{row.battery_id}": ['
+            battery_id = row.battery_id
+        else:
+            yield ", "
+
+        item = {"datetime": row.datetime.strftime(DEFAULT_DATETIME_FORMAT)}
+        item.update((field, getattr(row, field)) for field in fields)
+        yield json.dumps(item)
+
+    yield ("" if battery_id is None else "]") + "}}"
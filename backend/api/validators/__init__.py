@@ -3,6 +3,7 @@ from .battery_validator import (
     validate_edit_battery,
     validate_delete_battery_loads,
     validate_put_battery_loads,
+    validate_get_battery_range,
 )
 from .activation_validator import (
     validate_retrieve_active_programs,
@@ -27,5 +28,6 @@ __all__ = [
     "validate_change_alarm_status",
     "validate_get_alarm_history",
     "validate_delete_battery_loads",
-    "validate_put_battery_loads"
+    "validate_put_battery_loads",
+    "validate_get_battery_range",
 ]
@@ -11,14 +11,18 @@ class APIArgument(Argument):
     def handle_validation_error(self, error, bundle_errors):
         help_str = "(%s) " % self.help if self.help else ""
         msg = "[%s]: %s%s" % (self.name, help_str, str(error))
-        res = Response(
-            json.dumps(
-                {
-                    "message": msg,
-                    "code": 400,
-                }
-            ),
-            mimetype="application/json",
-            status=400,
-        )
-        return abort(res)
+        return abort_bad_request(msg)
+
+
+def abort_bad_request(msg):
+    res = Response(
+        json.dumps(
+            {
+                "message": msg,
+                "code": 400,
+            }
+        ),
+        mimetype="application/json",
+        status=400,
+    )
+    return abort(res)
@@ -1,10 +1,10 @@
 from datetime import datetime
 
 from flask_restful import reqparse
-from .base import APIArgument
+from .base import APIArgument, abort_bad_request
 
 from backend.utils import tznow
-from backend.configs import TIMEZONE
+from backend.configs import RANGE_MAX_DAYS, TIMEZONE
 
 
 def validate_create_battery():
@@ -89,3 +89,36 @@ def validate_put_battery_loads():
     args = parser.parse_args()
 
     return args
+
+
+def validate_get_battery_range():
+    parser = reqparse.RequestParser(
+        argument_class=APIArgument, bundle_errors=True)
+
+    parser.add_argument(
+        "start",
+        type=lambda x: datetime.strptime(x, "%Y-%m-%d").date(),
+        required=True,
+        location="args",
+    )
+    parser.add_argument(
+        "end",
+        type=lambda x: datetime.strptime(x, "%Y-%m-%d").date(),
+        location="args",
+        default=tznow(TIMEZONE).date(),
+    )
+    parser.add_argument("battery_id", type=int, action="append", location="args")
+    parser.add_argument("battery_id[]", type=int, action="append", location="args")
+    parser.add_argument("resolution", type=str, choices=("hour", "day", "week"),
+                        location="args", default="hour")
+
+    args = parser.parse_args()
+    args["battery_id"] = (args["battery_id"] or []) + (args.pop("battery_id[]") or [])
+
+    if args["end"] < args["start"]:
+        return abort_bad_request("[end]: the end is before the start")
+
+    if (args["end"] - args["start"]).days >= RANGE_MAX_DAYS:
+        return abort_bad_request(f"[end]: the range is longer than {RANGE_MAX_DAYS} days")
+
+    return args
@@ -1,4 +1,6 @@
 import sys
+import time
+from contextlib import contextmanager
 
 from flask import Flask, session
 from backend import configs
@@ -59,34 +61,61 @@ def _create_app(config_object: object = configs.FlaskProductionConfig, **kwargs)
     """
     # WARNING: DO NOT FUCK WITH THE ORDER OF THESE CALLS or nightmares will ensue.
 
-    app = Flask(__name__, **kwargs)
-    CORS(app)
-    configure_app(app=app, config_object=config_object)
+    timings = {}
 
-    extensions = dict(get_extensions(configs.EXTENSIONS))
-    register_extensions(app, extensions)
+    with timed(timings, "configure"):
+        app = Flask(__name__, **kwargs)
+        CORS(app)
+        configure_app(app=app, config_object=config_object)
 
-    blueprints = dict(get_blueprints())
-    register_blueprints(app, blueprints)
+    with timed(timings, "extensions"):
+        extensions = dict(get_extensions(configs.EXTENSIONS))
+        register_extensions(app, extensions)
+
+    with timed(timings, "blueprints"):
+        blueprints = dict(get_blueprints())
+        register_blueprints(app, blueprints)
 
     # Register all models declared in ```backend/models```
-    models = dict(get_models())
-    app.models = models
+    with timed(timings, "models"):
+        models = dict(get_models())
+        app.models = models
 
     # Register all serializers declared in ```backend/serializers```
-    serializers = dict(get_serializers())
-    app.serializers = serializers
+    with timed(timings, "serializers"):
+        serializers = dict(get_serializers())
+        app.serializers = serializers
 
     # register cli commands
-    commands = dict(get_commands())
-    register_cli_commands(app, commands)
+    with timed(timings, "commands"):
+        commands = dict(get_commands())
+        register_cli_commands(app, commands)
 
     # register shell context
-    register_shell_context(app, extensions)
+    with timed(timings, "shell"):
+        register_shell_context(app, extensions)
+
+    app.startup_timings = timings
+    logger.info(
+        "The app is created in %.1f ms (%s)",
+        sum(timings.values()),
+        ", ".join(f"{phase}: {duration:.1f} ms" for phase, duration in timings.items()),
+    )
 
     return app
 
 
+@contextmanager
+def timed(timings: dict, phase: str):
+    """Measure the duration (ms) of a phase of the app creation into ``timings``."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = (time.perf_counter() - start) * 1000
+
+
 def configure_app(
         app: Flask, config_object: object = configs.FlaskProductionConfig
 ) -> None:
@@ -1,4 +1,6 @@
 from .cache import cache
 from .clean import clean
+from .imports import import_time
+from .registry import registry
 
 EXISTING_EXTENSION_GROUPS = ()
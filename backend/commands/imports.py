@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from collections import defaultdict
+
+import click
+
+# the packages which the web workers should not import (they are loaded on first use)
+HEAVY_PACKAGES = ("numpy", "pandas", "scipy", "pyomo", "deepdiff")
+
+# what a web worker imports on boot
+APP_IMPORT = "from backend.app import create_app; create_app()"
+
+
+@click.command("import-time")
+@click.argument("modules", nargs=-1)
+@click.option("--limit", default=15, show_default=True, help="The number of the packages to list.")
+@click.option("--budget", type=float, help="Fail if the total import time (ms) is more than it.")
+def import_time(modules, limit, budget):
+    """Report the import time of the app (or of the given modules).
+
+    The modules are imported by a new interpreter with ``-X importtime``, the packages
+    are listed by their own import time and the loaded heavy packages are reported.
+    """
+
+    code = "; ".join(f"import {module}" for module in modules) if modules else APP_IMPORT
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise click.ClickException(f"Import failed:\n{process.stderr[-2000:]}")
+
+    # "import time: <self us> | <cumulative us> | <nested module name>"
+    packages = defaultdict(int)
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        self_time, _, name = line[len("import time:"):].split("|")
+        if self_time.strip().isdigit():
+            packages[name.strip().split(".")[0]] += int(self_time)
+
+    total = sum(packages.values()) / 1000
+    click.echo(f"Total import time: {total:.0f} ms ({len(packages)} packages)\n")
+    click.echo(f"{'package':<30}{'self [ms]':>12}")
+
+    for name, self_time in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]:
+        click.echo(f"{name:<30}{self_time / 1000:>12.1f}")
+
+    heavy = [name for name in HEAVY_PACKAGES if name in packages]
+    click.echo(f"\nHeavy packages loaded: {', '.join(heavy) if heavy else 'none'}")
+
+    if budget is not None and total > budget:
+        raise click.ClickException(f"The import time ({total:.0f} ms) is over the budget ({budget:.0f} ms)")
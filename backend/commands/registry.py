@@ -0,0 +1,23 @@
+import click
+
+from backend.magic import REGISTRY_PATH, render_registry, write_registry
+
+
+@click.command("registry")
+@click.option("--check", is_flag=True, help="Fail if the registry is not up to date (does not write it).")
+def registry(check):
+    """Generate the registry of the blueprints, models, serializers and commands.
+
+    The app loads its components from ``backend/registry.py`` instead of finding them
+    by reflection on every boot (except in the debug mode).
+    """
+
+    if check:
+        with open(REGISTRY_PATH) as registry_file:
+            if registry_file.read() != render_registry():
+                raise click.ClickException("The registry is stale, run `flask registry`.")
+
+        click.echo("The registry is up to date.")
+        return
+
+    click.echo("The registry is updated." if write_registry() else "The registry is up to date.")
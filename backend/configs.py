@@ -115,6 +115,10 @@ ALLOWED_HOSTS = {"www.{FLASK_HOST}:{FLASK_PORT}", "{FLASK_HOST}:{FLASK_PORT}"}
 
 CBIOT_USERNAME = get_environment_variable(cast=str(), name="CBIOT_USERNAME")
 CBIOT_PASSWORD = get_environment_variable(cast=str(), name="CBIOT_PASSWORD")
+# the lifetime (seconds) of the cached CBIOT tag values, and how long (seconds) an
+# expired value is still served while it is refreshed (0: never)
+CBIOT_TAG_CACHE_TTL = get_environment_variable(cast=int(), name="CBIOT_TAG_CACHE_TTL", default=30)
+CBIOT_TAG_CACHE_STALE_TTL = get_environment_variable(cast=int(), name="CBIOT_TAG_CACHE_STALE_TTL", default=0)
 
 UMG_CLIENT_HOST = get_environment_variable(cast=str(), name="UMG_CLIENT_HOST")
 UMG_CLIENT_SSL = get_environment_variable(
@@ -131,6 +135,34 @@ TIMEZONE = get_environment_variable(cast=str, name="TIMEZONE")
 DEBUG = get_environment_variable(cast=bool, name="DEBUG", default=False)
 
 GLOBAL_PROGRAMS = ["GA", "DR", "HOEP"]
+
+# the lifetime (seconds) of the fingerprints of the saved dispatches (see
+# backend.tasks.dispatch), set the redis maxmemory-policy to volatile-lru to evict
+# them when the memory is full
+DISPATCH_CACHE_TTL = get_environment_variable(cast=int(), name="DISPATCH_CACHE_TTL", default=86400)
+# the number of the solver processes of the fleet dispatch (see backend.modules.derms),
+# and the longest time (seconds) a fleet dispatch holds its lock (one process runs it)
+DISPATCH_WORKERS = get_environment_variable(cast=int(), name="DISPATCH_WORKERS", default=min(4, os.cpu_count() or 1))
+DISPATCH_LOCK_TIMEOUT = get_environment_variable(cast=int(), name="DISPATCH_LOCK_TIMEOUT", default=3000)
+# the number of the components whose loads are fetched at once, and the deadline
+# (seconds) of fetching all of them (the loads job runs every 60 seconds)
+LOAD_FETCH_WORKERS = get_environment_variable(cast=int(), name="LOAD_FETCH_WORKERS", default=8)
+LOAD_FETCH_TIMEOUT = get_environment_variable(cast=int(), name="LOAD_FETCH_TIMEOUT", default=45)
+# the connect/read timeouts (seconds), the number of the retries and the time (seconds)
+# after which a request is no longer retried, of the requests to the external APIs
+# (see backend.utils.http)
+HTTP_CONNECT_TIMEOUT = get_environment_variable(cast=int(), name="HTTP_CONNECT_TIMEOUT", default=5)
+HTTP_READ_TIMEOUT = get_environment_variable(cast=int(), name="HTTP_READ_TIMEOUT", default=30)
+HTTP_RETRIES = get_environment_variable(cast=int(), name="HTTP_RETRIES", default=3)
+HTTP_RETRY_DEADLINE = get_environment_variable(cast=int(), name="HTTP_RETRY_DEADLINE", default=45)
+# the lifetime (seconds) of an API token without an expiry claim, and the time (seconds)
+# before the expiry to refresh it (see backend.utils.tokens)
+TOKEN_LIFETIME = get_environment_variable(cast=int(), name="TOKEN_LIFETIME", default=3600)
+TOKEN_REFRESH_MARGIN = get_environment_variable(cast=int(), name="TOKEN_REFRESH_MARGIN", default=300)
+# the longest range (days) of the range endpoints, and the number of the rows which are
+# read from the database at once while a range is streamed (see backend.api.common)
+RANGE_MAX_DAYS = get_environment_variable(cast=int(), name="RANGE_MAX_DAYS", default=366)
+RANGE_BATCH_SIZE = get_environment_variable(cast=int(), name="RANGE_BATCH_SIZE", default=1000)
 # ordered list of extensions to register before the bundles
 # syntax is import.name.in.dot.module.notation:extension_instance_name
 EXTENSIONS = [
@@ -8,6 +8,7 @@ from sqlalchemy.orm import validates
 
 from .base import BaseModel
 from .column import Column
+from .filters import on_day, on_days
 from .mixins import PrimaryKeyMixin, TimestampMixin
 from .model import Model
 from .types import (
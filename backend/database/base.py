@@ -1,5 +1,7 @@
 from backend.extensions import db
 from backend.utils import pluralize, title_case
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declared_attr
 
 
@@ -63,6 +65,94 @@ class BaseModel(db.Model):
             instance = cls.create(**kwargs, commit=commit)
         return instance
 
+    @classmethod
+    def bulk_upsert(cls, rows, conflict_keys, update_keys=None, commit=False, batch_size=1000):
+        """Insert many models, or update them if they already exist, by one statement per batch.
+        :param list rows: The model attribute values of each model (dicts with the same keys).
+        :param conflict_keys: The attributes of a unique constraint, a model which already
+            exists by them is updated (the last one of the duplicated rows is kept).
+        :param update_keys: The attributes to update, by default all the given attributes
+            except the conflict keys.
+        :param bool commit: Whether or not to immediately commit the DB session.
+        :param int batch_size: The number of rows of each statement.
+        :return: The upserted models.
+        """
+        rows = cls._unique_rows(rows, conflict_keys)
+        if not rows:
+            return []
+
+        if update_keys is None:
+            update_keys = [key for key in rows[0] if key not in conflict_keys]
+
+        # ON CONFLICT DO NOTHING does not return the existing rows, they are selected again
+        returning = cls._dialect() == "postgresql" and bool(update_keys)
+        instances = []
+
+        for start in range(0, len(rows), batch_size):
+            statement = cls._insert().values(rows[start:start + batch_size])
+            updates = {key: statement.excluded[key] for key in update_keys}
+
+            if not updates:
+                statement = statement.on_conflict_do_nothing(index_elements=conflict_keys)
+            else:
+                if "updated_at" in cls.__table__.columns and "updated_at" not in updates:
+                    updates["updated_at"] = func.now()
+                statement = statement.on_conflict_do_update(index_elements=conflict_keys, set_=updates)
+
+            if returning:
+                query = (
+                    select(cls)
+                    .from_statement(statement.returning(*cls.__table__.columns))
+                    .execution_options(populate_existing=True)
+                )
+                instances.extend(db.session.execute(query).scalars())
+            else:
+                db.session.execute(statement)
+
+        if not returning:
+            instances = cls._get_by_keys(rows, conflict_keys)
+
+        if commit:
+            db.session.commit()
+        return instances
+
+    @classmethod
+    def bulk_get_or_create(cls, rows, conflict_keys, commit=False, batch_size=1000):
+        """Get or create many models by one statement per batch.
+        The existing models are not changed, only the missing ones are inserted.
+        :param list rows: The model attribute values of each model (dicts with the same keys).
+        :param conflict_keys: The attributes of a unique constraint to get the models by.
+        :param bool commit: Whether or not to immediately commit the DB session.
+        :param int batch_size: The number of rows of each statement.
+        :return: The models.
+        """
+        return cls.bulk_upsert(rows, conflict_keys, update_keys=(), commit=commit, batch_size=batch_size)
+
+    @classmethod
+    def _dialect(cls):
+        return db.engine.dialect.name
+
+    @classmethod
+    def _insert(cls):
+        """Get the INSERT ... ON CONFLICT statement of the database dialect."""
+        dialect = cls._dialect()
+        if dialect == "postgresql":
+            return postgresql.insert(cls)
+        if dialect == "sqlite":
+            return sqlite.insert(cls)
+        raise Exception(f"The bulk upsert is not supported by {dialect}")
+
+    @staticmethod
+    def _unique_rows(rows, conflict_keys):
+        """Drop the duplicated rows by the conflict keys (ON CONFLICT can not touch a row twice)."""
+        return list({tuple(row[key] for key in conflict_keys): row for row in rows}.values())
+
+    @classmethod
+    def _get_by_keys(cls, rows, conflict_keys):
+        columns = tuple_(*(getattr(cls, key) for key in conflict_keys))
+        values = [tuple(row[key] for key in conflict_keys) for row in rows]
+        return cls.query.filter(columns.in_(values)).populate_existing().all()
+
     @classmethod
     def join(cls, *props, **kwargs):
         return cls.query.join(*props, **kwargs)
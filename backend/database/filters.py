@@ -0,0 +1,51 @@
+import datetime
+
+from sqlalchemy import and_, types
+
+
+def on_day(column, day: datetime.date):
+    """Filter a date or datetime column by a day, as a range which can use its index.
+
+    ``func.date(column) == day`` wraps the column in a function, so the database has
+    to scan the whole table. This is ``column >= day AND column < day + 1`` instead.
+
+    Parameters
+    ----------
+    column : sqlalchemy.Column
+        A ``Date`` or ``DateTime`` column (or its model attribute).
+    day : datetime.date
+        The day (the date of a datetime).
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.BooleanClauseList
+        The filter expression.
+    """
+
+    return on_days(column, day, day)
+
+
+def on_days(column, start: datetime.date, end: datetime.date):
+    """Filter a date or datetime column by a range of days (see ``on_day``).
+
+    Parameters
+    ----------
+    column : sqlalchemy.Column
+        A ``Date`` or ``DateTime`` column (or its model attribute).
+    start : datetime.date
+        The first day.
+    end : datetime.date
+        The last day (included).
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.BooleanClauseList
+        The filter expression.
+    """
+
+    start, end = (day.date() if isinstance(day, datetime.datetime) else day for day in (start, end))
+
+    if not isinstance(column.type, types.Date):
+        start, end = (datetime.datetime.combine(day, datetime.time()) for day in (start, end))
+
+    return and_(column >= start, column < end + datetime.timedelta(days=1))
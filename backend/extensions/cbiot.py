@@ -1,5 +1,12 @@
 from backend import configs
-from backend.modules.cbiot import CBIOT
+from backend.extensions import redis
+from backend.modules.cbiot import CBIOT, TagCache
+from backend.utils.tokens import TokenStore
 
 # CBIOT client
-cbiot = CBIOT(username=configs.CBIOT_USERNAME, password=configs.CBIOT_PASSWORD)
+cbiot = CBIOT(
+    username=configs.CBIOT_USERNAME,
+    password=configs.CBIOT_PASSWORD,
+    cache=TagCache(redis, ttl=configs.CBIOT_TAG_CACHE_TTL, stale_ttl=configs.CBIOT_TAG_CACHE_STALE_TTL),
+    token_store=TokenStore(redis, name=f"cbiot:{configs.CBIOT_USERNAME}"),
+)
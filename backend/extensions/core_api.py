@@ -1,7 +1,11 @@
 from backend import configs
+from backend.extensions import redis
 from backend.modules.coreAPI import CoreAPI
+from backend.utils.tokens import TokenStore
 
 # CORE-API client
 core_api = CoreAPI(
-    username=configs.CORE_API_USERNAME, password=configs.CORE_API_PASSWORD
+    username=configs.CORE_API_USERNAME,
+    password=configs.CORE_API_PASSWORD,
+    token_store=TokenStore(redis, name=f"core-api:{configs.CORE_API_USERNAME}"),
 )
@@ -1,14 +1,20 @@
 import inspect
+import os
 import warnings
 from importlib import import_module
 from types import ModuleType
-from typing import Callable, Generator, List, Tuple
+from typing import Callable, Generator, List, Optional, Tuple
 
 import click
 from flask import Blueprint
 from flask_marshmallow.schema import Schema
 from flask_sqlalchemy import Model
 
+from backend import configs
+
+# the generated registry of the components (see ``write_registry``)
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "registry.py")
+
 
 def get_members(
     module: ModuleType, predicate: Callable[[str, object], bool]
@@ -222,74 +228,157 @@ def get_extensions(
         An iterable of (instance_name, extension_instance) tuples.
     """
 
-    extension_modules = {}
     for import_name in import_names:
         module_name, extension_name = import_name.rsplit(":")
+        extension = getattr(import_module(module_name), extension_name, None)
 
-        if module_name not in extension_modules:
-            module = import_module(module_name)
-            extension_modules[module_name] = dict(get_members(module, is_extension))
-
-        extension_module = extension_modules[module_name]
-        if extension_name in extension_module:
-            yield extension_name, extension_module[extension_name]
+        if is_extension(extension_name, extension):
+            yield extension_name, extension
         else:
             warnings.warn(
                 f"Could not find the {extension_name} extension in the {module_name} module (did you forget to instantiate it?)"
             )
 
 
-def get_blueprints() -> Generator[Tuple[str, object], None, None]:
+def import_string(import_name: str) -> object:
+    """Import an object by its import name ("module_name:object_name")."""
+
+    module_name, name = import_name.rsplit(":", 1)
+    return getattr(import_module(module_name), name)
+
+
+def get_registry() -> Optional[ModuleType]:
+    """A Helper function to get the generated registry of the components.
+
+    The components are found by reflection (not by the registry) in the debug mode
+    or if the registry is not generated.
+
+    Returns
+    -------
+    ModuleType or None
+        The ``backend.registry`` module.
+    """
+
+    if configs.get_environment_variable(cast=bool(), name="FLASK_DEBUG", default=False):
+        return None
+
+    try:
+        from backend import registry
+    except ImportError:
+        return None
+
+    return registry
+
+
+def get_registered(import_names: List[str]) -> Generator[Tuple[str, object], None, None]:
+    """A Helper function to get the components of the registry.
+
+    Parameters
+    ----------
+    import_names : List[str]
+        A list of import names in the form of "module_name:object_name".
+
+    Returns
+    -------
+    tuple
+        An iterable of (object_name, object) tuples.
+    """
+
+    for import_name in import_names:
+        yield import_name.rsplit(":", 1)[1], import_string(import_name)
+
+
+def get_blueprints(use_registry: bool = True) -> Generator[Tuple[str, object], None, None]:
     """A Helper function to get the blueprints list.
 
+    Parameters
+    ----------
+    use_registry : bool, optional
+        Use the generated registry if there is one, by default True.
+
     Returns
     -------
     tuple
         An iterable of (name, blueprint_instance) tuples.
     """
 
+    registry = get_registry() if use_registry else None
+    if registry is not None:
+        yield from get_registered(registry.BLUEPRINTS)
+        return
+
     from backend.extensions import blueprints
 
     yield from get_members(blueprints, is_blueprint)
 
 
-def get_models() -> Generator[Tuple[str, object], None, None]:
+def get_models(use_registry: bool = True) -> Generator[Tuple[str, object], None, None]:
     """A Helper function to get the models list.
 
+    Parameters
+    ----------
+    use_registry : bool, optional
+        Use the generated registry if there is one, by default True.
+
     Returns
     -------
     tuple
         An iterable of (name, model_instance) tuples.
     """
 
+    registry = get_registry() if use_registry else None
+    if registry is not None:
+        yield from get_registered(registry.MODELS)
+        return
+
     from backend import models
 
     yield from get_members(models, is_model)
 
 
-def get_serializers() -> Generator[Tuple[str, object], None, None]:
+def get_serializers(use_registry: bool = True) -> Generator[Tuple[str, object], None, None]:
     """A Helper function to get the serializers list.
 
+    Parameters
+    ----------
+    use_registry : bool, optional
+        Use the generated registry if there is one, by default True.
+
     Returns
     -------
     tuple
         An iterable of (name, serializer_instance) tuples.
     """
 
+    registry = get_registry() if use_registry else None
+    if registry is not None:
+        yield from get_registered(registry.SERIALIZERS)
+        return
+
     from backend import serializers
 
     yield from get_members(serializers, is_serializer)
 
 
-def get_commands() -> Generator[Tuple[str, object], None, None]:
+def get_commands(use_registry: bool = True) -> Generator[Tuple[str, object], None, None]:
     """A Helper function to get the commands list.
 
+    Parameters
+    ----------
+    use_registry : bool, optional
+        Use the generated registry if there is one, by default True.
+
     Returns
     -------
     tuple
         An iterable of (name, command_instance) tuples.
     """
 
+    registry = get_registry() if use_registry else None
+    if registry is not None:
+        yield from get_registered(registry.COMMANDS)
+        return
+
     from backend import commands
 
     existing_group_commands = {}
@@ -304,3 +393,64 @@ def get_commands() -> Generator[Tuple[str, object], None, None]:
         )
 
     yield from get_members(commands, _is_click_command)
+
+
+def render_registry() -> str:
+    """Render the registry of the components which are found by reflection.
+
+    Returns
+    -------
+    str
+        The source of ``backend/registry.py``.
+    """
+
+    from backend import commands, models, serializers
+    from backend.extensions import blueprints
+
+    sections = (
+        ("BLUEPRINTS", blueprints, get_blueprints),
+        ("MODELS", models, get_models),
+        ("SERIALIZERS", serializers, get_serializers),
+        ("COMMANDS", commands, get_commands),
+    )
+
+    lines = [
+        '"""',
+        "Generated registry of the app components (see ``backend.magic``), do not edit.",
+        "",
+        "Run ``flask registry`` after adding a blueprint, a model, a serializer or a command.",
+        '"""',
+    ]
+    for name, module, get_components in sections:
+        lines += ["", f"{name} = ["]
+        lines += [f'    "{module.__name__}:{component}",' for component, _ in get_components(use_registry=False)]
+        lines += ["]"]
+
+    return "\n".join(lines) + "\n"
+
+
+def write_registry(path: str = REGISTRY_PATH) -> bool:
+    """Write the registry of the components (see ``render_registry``).
+
+    Parameters
+    ----------
+    path : str, optional
+        The path of the registry, by default ``backend/registry.py``.
+
+    Returns
+    -------
+    bool
+        True if the registry is changed, False otherwise.
+    """
+
+    source = render_registry()
+
+    if os.path.exists(path):
+        with open(path) as registry_file:
+            if registry_file.read() == source:
+                return False
+
+    with open(path, "w") as registry_file:
+        registry_file.write(source)
+
+    return True
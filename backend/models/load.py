@@ -1,4 +1,4 @@
-from backend.database import Column, DateTime, Float, Integer, Model, UniqueConstraint
+from backend.database import Column, DateTime, Float, Integer, Model, UniqueConstraint, declared_attr
 
 
 class LoadModel(Model):
@@ -6,11 +6,14 @@ class LoadModel(Model):
     value: float = Column(Float())
     component_id = Column(Integer, nullable=False)
 
-    UniqueConstraint(datetime, component_id)
-
     __abstract__: bool = True
     __repr_props__ = ("id", "component_id", "datetime", "value")
 
+    @declared_attr
+    def __table_args__(cls):
+        # a constraint of an abstract model is not copied to its tables
+        return (UniqueConstraint("datetime", "component_id"), {"extend_existing": True})
+
     def get_id(self):
         return self.id
 
@@ -1,15 +1,16 @@
-from backend.database import Column, Model, DateTime, Float, Integer, ForeignKey
+from backend.database import Column, Model, DateTime, Float, Integer, ForeignKey, UniqueConstraint
 
 
 class Result(Model):
     __tablename__ = "results"
 
     battery_id = Column(Integer, ForeignKey("battery.id"), nullable=False)
-    datetime = Column(DateTime(), index=True, unique=True)
+    datetime = Column(DateTime(), index=True)
     charging_status: int = Column(Integer())
     power = Column(Float())
     soc = Column(Float())
     utility_power = Column(Float(), nullable=True)
+    UniqueConstraint(datetime, battery_id)
 
     __repr_props__ = (
         "id",
@@ -1 +1,3 @@
+from .cache import TagCache
 from .cbiot import CBIOT
+from .snapshot import Snapshot
@@ -0,0 +1,148 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .logger import logger
+from .settings import SETPOINT_CACHE_PREFIX, SETPOINT_TTL, TAG_CACHE_PREFIX, TAG_CACHE_STALE_TTL, TAG_CACHE_TTL
+
+
+class TagCache:
+    """Redis cache of the last tag values, keyed by the tag UUID.
+
+    A value is fresh for ``ttl`` seconds. With ``stale_ttl`` (stale-while-revalidate)
+    an older value is still served up to ``stale_ttl`` seconds more, while one caller
+    refreshes it in the background. A Redis failure is logged and the tags are
+    fetched directly.
+
+    Parameters
+    ----------
+    redis : redis.Redis
+        The Redis client.
+    ttl : int, optional
+        The lifetime (seconds) of a fresh value.
+    stale_ttl : int, optional
+        The lifetime (seconds) of a stale value after ``ttl``, 0 disables it.
+    setpoint_ttl : int, optional
+        The lifetime (seconds) of the last acknowledged setpoint of a command tag.
+    """
+
+    def __init__(
+        self,
+        redis,
+        ttl: int = TAG_CACHE_TTL,
+        stale_ttl: int = TAG_CACHE_STALE_TTL,
+        setpoint_ttl: int = SETPOINT_TTL,
+    ):
+        self.redis = redis
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.setpoint_ttl = setpoint_ttl
+        self._executor = None
+
+    @staticmethod
+    def key(tag: str) -> str:
+        return f"{TAG_CACHE_PREFIX}{tag}"
+
+    def get_many(self, tags: list, fetch) -> dict:
+        """Get the cached values of the tags.
+
+        Parameters
+        ----------
+        tags : list
+            The tag UUIDs.
+        fetch : callable
+            Fetch the value of a tag from the API, used to revalidate the stale values.
+
+        Returns
+        -------
+        dict
+            The value of each cached tag (by tag UUID), the missing tags are not included.
+        """
+
+        try:
+            entries = self.redis.mget([self.key(tag) for tag in tags])
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+            return {}
+
+        now = time.time()
+        values = {}
+
+        for tag, entry in zip(tags, entries):
+            if entry is None:
+                continue
+
+            entry = json.loads(entry)
+            age = now - entry["time"]
+
+            if age < self.ttl:
+                values[tag] = entry["value"]
+
+            elif age < self.ttl + self.stale_ttl:
+                values[tag] = entry["value"]
+                self.revalidate(tag, fetch)
+
+        return values
+
+    def set(self, tag: str, value) -> None:
+        try:
+            entry = json.dumps({"value": value, "time": time.time()})
+            self.redis.set(self.key(tag), entry, ex=self.ttl + self.stale_ttl)
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+
+    def delete(self, *tags: str) -> None:
+        try:
+            self.redis.delete(*(self.key(tag) for tag in tags))
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+
+    def get(self, tag: str, fetch):
+        """Get the value of a tag, it is fetched and cached if it is not cached."""
+
+        values = self.get_many([tag], fetch)
+
+        if tag in values:
+            return values[tag]
+
+        value = fetch(tag)
+        self.set(tag, value)
+        return value
+
+    def get_setpoint(self, tag: str):
+        """Get the last acknowledged setpoint of a command tag (None if it is not known)."""
+
+        try:
+            value = self.redis.get(f"{SETPOINT_CACHE_PREFIX}{tag}")
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+            return None
+
+        return json.loads(value) if value is not None else None
+
+    def set_setpoint(self, tag: str, value) -> None:
+        try:
+            self.redis.set(f"{SETPOINT_CACHE_PREFIX}{tag}", json.dumps(value), ex=self.setpoint_ttl)
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+
+    def revalidate(self, tag: str, fetch) -> None:
+        """Refresh a stale value in the background, by one caller (of all the processes)."""
+
+        try:
+            if not self.redis.set(f"{self.key(tag)}:refresh", 1, nx=True, ex=max(1, self.ttl)):
+                return
+        except Exception as exc:
+            logger.warning("The tag cache is not available: %s", exc)
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+
+        def refresh():
+            try:
+                self.set(tag, fetch(tag))
+            except Exception as exc:
+                logger.error("Failed to refresh the %s tag: %s", tag, exc)
+
+        self._executor.submit(refresh)
@@ -1,42 +1,75 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
 
+from backend.utils.tokens import TokenStore
+
+from .cache import TagCache
 from .client import Client
 from .exceptions import UnauthorizedError
 from .logger import logger
 from .settings import *
+from .snapshot import Snapshot
 from .utils import validate_response
 
 
 class CBIOT:
-    def __init__(self, username: str, password: str, debug: bool = False):
-        self.client = Client(username=username, password=password, debug=debug)
+    def __init__(
+        self, username: str, password: str, debug: bool = False, cache: TagCache = None, token_store: TokenStore = None
+    ):
+        self.client = Client(username=username, password=password, debug=debug, token_store=token_store)
+        self.cache = cache
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
 
     def _fetch(self, uri: str, **kwargs):
         url = f"{self.client.CBIOT_BASE_URL}{uri}"
         logger.info("Fetching '%s'", url)
 
-        return validate_response(self.client.session.get(url, **kwargs))
+        # the token is sent per request, the rejected one is replaced (see ``Client.fix_token``)
+        token = self.client.token
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": token}
+
+        try:
+            return validate_response(self.client.session.get(url, **kwargs))
+        except UnauthorizedError as exc:
+            exc.token = token
+            raise
 
     def _post(self, uri: str, **kwargs):
         url = f"{self.client.CBIOT_BASE_URL}{uri}"
         logger.info("Posting to '%s'", url)
 
-        return validate_response(self.client.session.post(url, **kwargs))
+        # the token is sent per request, the rejected one is replaced (see ``Client.fix_token``)
+        token = self.client.token
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": token}
+
+        try:
+            return validate_response(self.client.session.post(url, **kwargs))
+        except UnauthorizedError as exc:
+            exc.token = token
+            raise
 
     def _put(self, uri: str, **kwargs):
         url = f"{self.client.CBIOT_BASE_URL}{uri}"
         logger.info("Putting to '%s'", url)
 
-        return validate_response(self.client.session.put(url, **kwargs))
+        # the token is sent per request, the rejected one is replaced (see ``Client.fix_token``)
+        token = self.client.token
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": token}
+
+        try:
+            return validate_response(self.client.session.put(url, **kwargs))
+        except UnauthorizedError as exc:
+            exc.token = token
+            raise
 
     def get_modbus_tag_data(self, tag: str, period: str):
         uri = f"/tag/{tag}/data?period={period}"
         try:
             response = self._fetch(uri=uri)
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._fetch(uri=uri)
 
         return response
@@ -45,8 +78,8 @@ class CBIOT:
         uri = f"/tag/{tag}/data/range?date_start={start}&date_end={end}"
         try:
             response = self._fetch(uri=uri)
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._fetch(uri=uri)
         return response
 
@@ -54,8 +87,8 @@ class CBIOT:
         uri = f"/tag/{tag}/data/last?period={period}"
         try:
             response = self._fetch(uri=uri)
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._fetch(uri=uri)
         return response
 
@@ -65,58 +98,158 @@ class CBIOT:
 
         try:
             self._put(uri=uri, data=payload)
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             self._put(uri=uri, data=payload)
 
+        # the command is acknowledged, the cached reading of its tag is out of date
+        if self.cache is not None:
+            self.cache.set_setpoint(tag, int(f"{params}"))
+            if tag in SETPOINT_READ_TAGS:
+                self.cache.delete(SETPOINT_READ_TAGS[tag])
+
+    def is_applied(self, tag: str, value: int, verify: bool = False) -> bool:
+        """Check if a setpoint is the last acknowledged one of its command tag.
+
+        With ``verify`` the (cached) reading of the tag must also agree with it.
+        """
+        if self.cache is None or self.cache.get_setpoint(tag) != int(value):
+            return False
+
+        if not verify:
+            return True
+
+        try:
+            return self.get_tag_value(SETPOINT_READ_TAGS[tag]) == value
+        except Exception as exc:
+            logger.warning("Failed to read the %s tag, the setpoint is sent: %s", SETPOINT_READ_TAGS[tag], exc)
+            return False
+
+    def apply_setpoints(self, bdc_mode: int = None, power_limit: int = None, verify: bool = True) -> dict:
+        """Send the BDC mode and the power limit, the ones already applied are skipped.
+
+        Parameters
+        ----------
+        bdc_mode : int, optional
+            The BDC mode, not changed if None.
+        power_limit : int, optional
+            The power limit, not changed if None.
+        verify : bool, optional
+            Also check the readings of the tags before skipping a setpoint (see
+            ``is_applied``), so a state changed by the BMS itself (or by hand) is
+            commanded again, by default True.
+
+        Returns
+        -------
+        dict
+            The sent setpoints (by command tag).
+        """
+        sent = {}
+
+        for tag, value in ((SET_BDC_MODE_TAG, bdc_mode), (SET_POWER_LIMIT_TAG, power_limit)):
+            if value is None or self.is_applied(tag, value, verify=verify):
+                continue
+
+            self.send_modbus_command(tag=tag, params=value)
+            sent[tag] = value
+
+        return sent
+
+    def fetch_tag_value(self, tag: str):
+        """Fetch the last value of a tag from the API (None if it is not available)."""
+        data = self.get_modbus_tag_data_last(tag=tag, period=CBIOT_TIME)
+        return float(data.get("value")) if data and data.get("value") != "" else None
+
+    def get_tag_value(self, tag: str):
+        """Get the last value of a tag, the cached value is used if there is one."""
+        if self.cache is None:
+            return self.fetch_tag_value(tag)
+        return self.cache.get(tag, self.fetch_tag_value)
+
+    def get_snapshot(self, tags=None) -> Snapshot:
+        """Get the last values of some tags at once.
+
+        The cached tags are read by one request to the cache and the rest are fetched
+        concurrently, a tag which can not be fetched is logged and left None.
+
+        Parameters
+        ----------
+        tags : iterable of str, optional
+            The fields of ``Snapshot`` to fetch, by default all of them.
+
+        Returns
+        -------
+        Snapshot
+            The values of the tags.
+        """
+        names = list(tags) if tags is not None else [field.name for field in fields(Snapshot)]
+        unknown = set(names) - SNAPSHOT_TAGS.keys()
+
+        if unknown:
+            raise Exception(f"Unknown snapshot tags: {sorted(unknown)}")
+
+        if not names:
+            return Snapshot()
+
+        cached = {}
+        if self.cache is not None:
+            cached = self.cache.get_many([SNAPSHOT_TAGS[name] for name in names], self.fetch_tag_value)
+
+        values = {name: cached[SNAPSHOT_TAGS[name]] for name in names if SNAPSHOT_TAGS[name] in cached}
+        missing = [name for name in names if name not in values]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(SNAPSHOT_WORKERS, len(missing))) as executor:
+                futures = {name: executor.submit(self.fetch_tag_value, SNAPSHOT_TAGS[name]) for name in missing}
+
+            for name, future in futures.items():
+                try:
+                    values[name] = future.result()
+                except Exception as exc:
+                    logger.error("Failed to fetch the %s tag: %s", name, exc)
+                    continue
+
+                if self.cache is not None:
+                    self.cache.set(SNAPSHOT_TAGS[name], values[name])
+
+        return Snapshot(**values)
+
     # get data from CBIOT (battery)
     def get_state_of_charge(self):
-        data = self.get_modbus_tag_data_last(tag=STATE_OF_CHARGE_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(STATE_OF_CHARGE_TAG)
 
     def get_life_cycle(self):
-        data = self.get_modbus_tag_data_last(tag=LIFE_CYCLE_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(LIFE_CYCLE_TAG)
 
     def get_state_of_health(self):
-        data = self.get_modbus_tag_data_last(tag=STATE_OF_HEALTH_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(STATE_OF_HEALTH_TAG)
 
     def get_bdc_mode(self):
-        data = self.get_modbus_tag_data_last(tag=BDC_MODE_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(BDC_MODE_TAG)
 
     def get_power_limit(self):
-        data = self.get_modbus_tag_data_last(tag=POWER_LIMIT_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(POWER_LIMIT_TAG)
 
     def get_voltage(self):
-        data = self.get_modbus_tag_data_last(tag=VOLTAGE_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(VOLTAGE_TAG)
 
     def get_current(self):
-        data = self.get_modbus_tag_data_last(tag=CURRENT_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(CURRENT_TAG)
 
     def get_grid_frequency(self):
-        data = self.get_modbus_tag_data_last(tag=GRID_FREQUENCY_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(GRID_FREQUENCY_TAG)
 
     def get_average_grid_current(self):
-        data = self.get_modbus_tag_data_last(tag=AVERAGE_GRID_CURRENT_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(AVERAGE_GRID_CURRENT_TAG)
 
     def get_grid_reactive_power(self):
-        data = self.get_modbus_tag_data_last(tag=GRID_REACTIVE_POWER_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(GRID_REACTIVE_POWER_TAG)
 
     def get_grid_power_factor(self):
-        data = self.get_modbus_tag_data_last(tag=GRID_POWER_FACTOR_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(GRID_POWER_FACTOR_TAG)
 
     def get_ambient_temperature(self):
-        data = self.get_modbus_tag_data_last(tag=AMBIENT_TEMPERATURE_TAG, period=CBIOT_TIME)
-        return float(data.get("value")) if data and data.get("value") != "" else None
+        return self.get_tag_value(AMBIENT_TEMPERATURE_TAG)
 
     # send data to CBIOT (battery)
     def set_bdc_mode(self, value: int):
@@ -1,10 +1,13 @@
 import json
 import logging
+import threading
 
-import requests
+from backend.utils.http import create_session
+from backend.utils.tokens import TokenStore
 
 from .cookie_repository import CookieRepository
 from .logger import logger
+from .settings import SNAPSHOT_WORKERS
 from .utils import validate_response
 
 
@@ -16,11 +19,13 @@ class Client(object):
 
     REQUEST_HEADERS = {"Content-Type": "application/json"}
 
-    def __init__(self, username: str, password: str, debug: bool = False) -> None:
+    def __init__(self, username: str, password: str, debug: bool = False, token_store: TokenStore = None) -> None:
         self.username = username
         self.password = password
         self.debug = debug
-        self.session = requests.session()
+        self.token_store = token_store
+        self._lock = threading.RLock()  # one login at once without a token store
+        self.session = create_session(pool_size=SNAPSHOT_WORKERS)
         self.session.headers.update(Client.REQUEST_HEADERS)
         self.cookie_name = f"{username}_cookie"
 
@@ -39,7 +44,7 @@ class Client(object):
 
         payload = json.dumps({"username": self.username, "password": self.password})
 
-        response = requests.post(Client.LOGIN_BASE_URL, data=payload)
+        response = self.session.post(Client.LOGIN_BASE_URL, data=payload)
         data = validate_response(response)
 
         logger.info("You are successfully logged in.")
@@ -55,11 +60,25 @@ class Client(object):
         """
         self.session.headers["Authorization"] = token
 
+    def authorize(self):
+        """
+        Set the token of the session, it is requested on the first use (and refreshed
+        before its expiry by the token store).
+        """
+        if self.token_store is not None:
+            self._set_authorization_header(self.token_store.get(self._request_session_token))
+
+        elif "Authorization" not in self.session.headers:
+            with self._lock:
+                if "Authorization" not in self.session.headers:
+                    self.do_authentication_request()
+
     @property
     def token(self):
         """
         Get the bearer token for the session.
         """
+        self.authorize()
         return self.session.headers["Authorization"]
 
     def do_authentication_request(self):
@@ -67,6 +86,10 @@ class Client(object):
         Authenticate with the CBIOT API.
         """
 
+        if self.token_store is not None:
+            self.authorize()
+            return
+
         try:
             token = CookieRepository.get(self.cookie_name)
             self._set_authorization_header(token)
@@ -77,6 +100,23 @@ class Client(object):
         self._set_authorization_header(self._request_session_token())
         CookieRepository.save(self.token, self.cookie_name)
 
-    def fix_token(self):
-        self._set_authorization_header(self._request_session_token())
-        CookieRepository.save(self.token, self.cookie_name)
+    def fix_token(self, stale_token: str = None):
+        """
+        Replace a rejected token, unless another thread (or process) already did.
+
+        Parameters
+        ----------
+        stale_token : str, optional
+            The token which the rejected request was sent with.
+        """
+        if self.token_store is not None:
+            # the rejected token is replaced once for all the processes
+            self._set_authorization_header(self.token_store.refresh(self._request_session_token, stale_token))
+            return
+
+        with self._lock:
+            if stale_token is not None and self.session.headers.get("Authorization") not in (None, stale_token):
+                return
+
+            self._set_authorization_header(self._request_session_token())
+            CookieRepository.save(self.token, self.cookie_name)
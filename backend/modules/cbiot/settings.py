@@ -18,3 +18,30 @@ GRID_POWER_FACTOR_TAG = "7831c598-b5a2-4600-b7c4-78f8ed504d7d"
 AMBIENT_TEMPERATURE_TAG = "e3a55365-c2d8-4876-ae3c-8a8fb1e30400"
 SET_BDC_MODE_TAG = "b5227335-73be-477a-ad43-87c78b1c7f91"
 SET_POWER_LIMIT_TAG = "be5f8eb9-488c-4687-b5bf-2788f65331f5"
+
+# the tags of the fields of Snapshot (see CBIOT.get_snapshot)
+SNAPSHOT_TAGS = {
+    "state_of_charge": STATE_OF_CHARGE_TAG,
+    "life_cycle": LIFE_CYCLE_TAG,
+    "state_of_health": STATE_OF_HEALTH_TAG,
+    "bdc_mode": BDC_MODE_TAG,
+    "power_limit": POWER_LIMIT_TAG,
+    "voltage": VOLTAGE_TAG,
+    "current": CURRENT_TAG,
+    "grid_frequency": GRID_FREQUENCY_TAG,
+    "average_grid_current": AVERAGE_GRID_CURRENT_TAG,
+    "grid_reactive_power": GRID_REACTIVE_POWER_TAG,
+    "grid_power_factor": GRID_POWER_FACTOR_TAG,
+    "ambient_temperature": AMBIENT_TEMPERATURE_TAG,
+}
+SNAPSHOT_WORKERS = 12  # the number of the tags which are fetched at once
+
+# the cache of the last tag values (see TagCache)
+TAG_CACHE_PREFIX = "cbiot:tag:"
+TAG_CACHE_TTL = 30  # seconds
+TAG_CACHE_STALE_TTL = 0  # seconds, 0: no stale-while-revalidate
+# the last acknowledged setpoints of the command tags (see CBIOT.apply_setpoints),
+# a setpoint is sent again after SETPOINT_TTL even if it is not changed
+SETPOINT_CACHE_PREFIX = "cbiot:setpoint:"
+SETPOINT_TTL = 3600  # seconds
+SETPOINT_READ_TAGS = {SET_BDC_MODE_TAG: BDC_MODE_TAG, SET_POWER_LIMIT_TAG: POWER_LIMIT_TAG}
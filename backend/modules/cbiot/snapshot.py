@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """The last values of the battery tags (see ``CBIOT.get_snapshot``).
+
+    A value is None if its tag is not requested or not available.
+    """
+
+    state_of_charge: Optional[float] = None
+    life_cycle: Optional[float] = None
+    state_of_health: Optional[float] = None
+    bdc_mode: Optional[float] = None
+    power_limit: Optional[float] = None
+    voltage: Optional[float] = None
+    current: Optional[float] = None
+    grid_frequency: Optional[float] = None
+    average_grid_current: Optional[float] = None
+    grid_reactive_power: Optional[float] = None
+    grid_power_factor: Optional[float] = None
+    ambient_temperature: Optional[float] = None
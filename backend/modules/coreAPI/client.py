@@ -1,7 +1,10 @@
 import json
 import logging
+import threading
 
-import requests
+from backend.configs import LOAD_FETCH_WORKERS
+from backend.utils.http import create_session
+from backend.utils.tokens import TokenStore
 
 from .cookie_repository import CookieRepository
 from .logger import logger
@@ -14,13 +17,15 @@ class CoreAPIClient(object):
     CORE_BASE_URL: str = "https://api.edgecom.io"
     LOGIN_BASE_URL: str = f"{CORE_BASE_URL}/umg/login"
 
-    def __init__(self, username: str, password: str, debug: bool = False) -> None:
+    def __init__(self, username: str, password: str, debug: bool = False, token_store: TokenStore = None) -> None:
         self._cookies = None
         self.username = username
         self.password = password
         self.cookie_name = f"{username}_cookie"
         self.debug = debug
-        self.session = requests.session()
+        self.token_store = token_store
+        self._lock = threading.RLock()  # one login at once without a token store
+        self.session = create_session(pool_size=LOAD_FETCH_WORKERS)
 
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
 
@@ -38,7 +43,7 @@ class CoreAPIClient(object):
 
         payload = json.dumps({"username": self.username, "password": self.password})
 
-        response = requests.post(self.LOGIN_BASE_URL, headers=headers, data=payload)
+        response = self.session.post(self.LOGIN_BASE_URL, headers=headers, data=payload)
         data = validate_response(response)
 
         logger.info("You are successfully logged in.")
@@ -54,14 +59,32 @@ class CoreAPIClient(object):
         """
         self.session.headers["Authorization"] = token
 
+    def authorize(self):
+        """
+        Set the token of the session, it is requested on the first use (and refreshed
+        before its expiry by the token store).
+        """
+        if self.token_store is not None:
+            self._set_authorization_header(self.token_store.get(self._request_session_token))
+
+        elif "Authorization" not in self.session.headers:
+            with self._lock:
+                if "Authorization" not in self.session.headers:
+                    self.do_authentication_request()
+
     @property
     def token(self):
         """Get the bearer token for the session."""
+        self.authorize()
         return self.session.headers["Authorization"]
 
     def do_authentication_request(self):
         """Authenticate with the Core API."""
 
+        if self.token_store is not None:
+            self.authorize()
+            return
+
         try:
             token = CookieRepository.get(self.cookie_name)
             self._set_authorization_header(token)
@@ -72,6 +95,23 @@ class CoreAPIClient(object):
         self._set_authorization_header(self._request_session_token())
         CookieRepository.save(self.token, self.cookie_name)
 
-    def fix_token(self):
-        self._set_authorization_header(self._request_session_token())
-        CookieRepository.save(self.token, self.cookie_name)
+    def fix_token(self, stale_token: str = None):
+        """
+        Replace a rejected token, unless another thread (or process) already did.
+
+        Parameters
+        ----------
+        stale_token : str, optional
+            The token which the rejected request was sent with.
+        """
+        if self.token_store is not None:
+            # the rejected token is replaced once for all the processes
+            self._set_authorization_header(self.token_store.refresh(self._request_session_token, stale_token))
+            return
+
+        with self._lock:
+            if stale_token is not None and self.session.headers.get("Authorization") not in (None, stale_token):
+                return
+
+            self._set_authorization_header(self._request_session_token())
+            CookieRepository.save(self.token, self.cookie_name)
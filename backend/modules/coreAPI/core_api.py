@@ -1,11 +1,11 @@
 import json
 import logging
 
-import requests
 from dateutil import parser
 
 from backend.configs import TIMEZONE
 from backend.utils import tznow
+from backend.utils.tokens import TokenStore
 
 from .client import CoreAPIClient
 from .exceptions import UnauthorizedError
@@ -14,28 +14,42 @@ from .utils import customize_component_data, validate_response
 
 
 class CoreAPI:
-    """Class to getting data from core API."""
+    """Class to getting data from core API.
 
-    def __init__(self, username: str, password: str, debug: bool = False):
-        self.client = CoreAPIClient(username=username, password=password, debug=debug)
-        try:
-            self.client.do_authentication_request()
-        except Exception as exc:
-            logger.error("Error during authentication: %s", exc)
+    It does not connect on creation, the client authenticates on the first request.
+    """
 
+    def __init__(self, username: str, password: str, debug: bool = False, token_store: TokenStore = None):
+        self.client = CoreAPIClient(username=username, password=password, debug=debug, token_store=token_store)
         logging.basicConfig(level=logging.DEBUG if debug else logging.INFO)
 
     def _fetch(self, uri: str, **kwargs):
         url = f"{self.client.CORE_BASE_URL}{uri}"
         logger.info("Fetching '%s'", url)
 
-        return validate_response(self.client.session.get(url, **kwargs))
+        # the current token, the rejected one is replaced (see ``CoreAPIClient.fix_token``)
+        token = self.client.token
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": token}
+
+        try:
+            return validate_response(self.client.session.get(url, **kwargs))
+        except UnauthorizedError as exc:
+            exc.token = token
+            raise
 
     def _post(self, uri: str, **kwargs):
         url = f"{self.client.CORE_BASE_URL}{uri}"
         logger.info("Posting to '%s'", url)
 
-        return validate_response(self.client.session.post(url, **kwargs))
+        # the current token, the rejected one is replaced (see ``CoreAPIClient.fix_token``)
+        token = self.client.token
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": token}
+
+        try:
+            return validate_response(self.client.session.post(url, **kwargs))
+        except UnauthorizedError as exc:
+            exc.token = token
+            raise
 
     def get_component_data(self, start: str, end: str, component_id: int) -> dict:
         url = "/core/algorithm/series"
@@ -60,8 +74,8 @@ class CoreAPI:
         try:
             response = self._post(url, headers=headers, data=payload)
 
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._post(url, headers=headers, data=payload)
 
         return customize_component_data(response)
@@ -80,8 +94,8 @@ class CoreAPI:
         try:
             response = self._fetch(url, headers=headers, data=payload)
 
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._post(url, headers=headers, data=payload)
 
         activation_hours = response.get("result", {}).get("window", [])[-1]
@@ -102,8 +116,8 @@ class CoreAPI:
         try:
             response = self._fetch(url, headers=headers)
 
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._fetch(url, headers=headers)
 
         current_est = response.get("result", {}).get("peak_probability")
@@ -143,7 +157,7 @@ class CoreAPI:
         url = "https://api.edgecom.io/core/algorithm/json/global"
         payload = json.dumps({"algorithm_name": "DRStatus", "key": zone, "time": time})
         headers = {"accept": "application/json", "Content-Type": "application/json"}
-        response = requests.post(url, headers=headers, data=payload, timeout=5)
+        response = self.client.session.post(url, headers=headers, data=payload, timeout=5)
 
         if response.status_code != 200:
             raise Exception(response.text)
@@ -209,8 +223,8 @@ class CoreAPI:
         try:
             response = self._fetch(url, headers=headers)
 
-        except UnauthorizedError:
-            self.client.fix_token()
+        except UnauthorizedError as exc:
+            self.client.fix_token(exc.token)
             response = self._fetch(url, headers=headers)
 
         return response
@@ -3,7 +3,6 @@ import random
 import time
 from datetime import datetime
 
-import pandas as pd
 import requests
 
 from .exceptions import BadRequest, HTTPError, UnauthorizedError
@@ -42,6 +41,8 @@ def validate_response(response: requests.Response):
 
 
 def customize_component_data(comp_res: dict) -> list:
+    import pandas as pd
+
     comp_data = comp_res.get("result")[0]
     comp_df = pd.DataFrame(comp_data.get("values"))
 
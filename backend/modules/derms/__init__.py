@@ -1,2 +1,29 @@
-from .pcs_battery import PCSBattery
-from .ups_battery import UPSBattery
+"""
+derms package
+
+The optimizers (numpy, scipy and pyomo) are imported on the first use of their
+names, so importing the package (e.g. ``backend.modules.derms.settings``) stays cheap
+for the web workers.
+"""
+from importlib import import_module
+
+_EXPORTS = {
+    "dispatch_battery": ".dispatch",
+    "dispatch_fleet": ".dispatch",
+    "PCSBattery": ".pcs_battery",
+    "get_pcs_battery": ".pcs_battery",
+    "PCSBatteryMILP": ".pcs_milp",
+    "UPSBattery": ".ups_battery",
+    "schedule_ups_days": ".ups_battery",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
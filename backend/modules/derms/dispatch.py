@@ -0,0 +1,208 @@
+"""
+dispatch module
+
+Solve the daily dispatch of a fleet of batteries, one problem per battery, in a
+process pool. The inputs and outputs are plain (picklable) python objects, the
+database access is left to the callers.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from backend.modules.derms import settings
+
+from .logger import logger
+from .pcs_battery import get_pcs_battery
+from .ups_battery import UPSBattery
+
+# one single-worker pool per shard, a battery is always solved by the same worker
+# so its long-lived PCS model (see ``get_pcs_battery``) is reused
+_pools = []
+_pools_lock = threading.Lock()
+
+
+def calculate_ups_battery_consumption(inputs: dict) -> tuple:
+    """Calculate the charge, discharge and SOC of a UPS battery.
+
+    The times after the last executed one are scheduled from its stored SOC (rolling
+    horizon), the executed times are kept by ``dispatch_battery``.
+    """
+
+    features = inputs["battery_features"]
+    executed = inputs["executed"]
+    start = max(executed, default=0)
+    ups_battery = UPSBattery(
+        Load=inputs["load"],
+        programs=inputs["programs"],
+        now=inputs["now"],
+        SOC_max=features["soc_max"],
+        SOC_available=executed[start]["soc"] if start else features["soc_available"],
+        p_max=features["p_max"],
+        CHARGING_START_TIME=features["first_chargingـtimes_st"],
+        CHARGING_END_TIME=features["first_chargingـtimes_et"],
+        start=start,
+    )
+    ups_battery.check_program_activation()
+
+    return ups_battery.p_charge, ups_battery.p_discharge, ups_battery.soc
+
+
+def calculate_pcs_battery_consumption(inputs: dict) -> tuple:
+    """Calculate the charge, discharge and SOC of a PCS battery."""
+
+    pcs_battery = get_pcs_battery(inputs["battery_id"], inputs["battery_features"])
+
+    with pcs_battery.lock:
+        pcs_battery.update(
+            load=dict(enumerate(inputs["load"], 1)),
+            programs=inputs["programs"],
+            soc_available=inputs["battery_features"]["soc_available"],
+            executed=inputs["executed"],
+        )
+        pcs_battery.calculate_pcs_battery_consumption()
+
+        return pcs_battery.p_charge.copy(), pcs_battery.p_discharge.copy(), pcs_battery.soc.copy()
+
+
+def dispatch_battery(inputs: dict) -> dict:
+    """Calculate the daily dispatch of a battery.
+
+    Parameters
+    ----------
+    inputs : dict
+        - battery_id: the battery id.
+        - battery_type: ``PCS`` or ``UPS``.
+        - load: the 24 load values of the day.
+        - battery_features: the features of the battery (see ``PCSBattery``).
+        - programs: the programs of the day (see ``get_programs_windows``).
+        - executed: the already executed times (1..24) of the day, each one includes
+          ``p_charge``, ``p_discharge``, ``soc``, ``charging_status``, ``power`` and
+          ``utility_power``, they are kept as they are.
+        - now: the current hour (0..23), the UPS programs are dropped before it.
+
+    Returns
+    -------
+    dict
+        The battery id and the 24 values of ``charging_status``, ``power``, ``soc``
+        and ``utility_power``.
+    """
+
+    if inputs["battery_type"] == "UPS":
+        p_charge, p_discharge, soc = calculate_ups_battery_consumption(inputs)
+    else:
+        p_charge, p_discharge, soc = calculate_pcs_battery_consumption(inputs)
+
+    charging_status = np.zeros(24, dtype="int32")
+    charging_status[p_discharge != 0] = -1
+    charging_status[p_charge != 0] = 1
+    charging_status = charging_status.tolist()
+
+    power = np.abs((p_charge + p_discharge).round(4)).tolist()
+    soc = np.abs(soc.round(4)).tolist()
+    utility_power = [(a * b) + c for a, b, c in zip(charging_status, power, inputs["load"])]
+
+    # Keep the stored values of the executed hours
+    for t, item in inputs["executed"].items():
+        charging_status[t - 1] = item["charging_status"]
+        power[t - 1] = item["power"]
+        soc[t - 1] = item["soc"]
+        utility_power[t - 1] = item["utility_power"]
+
+    # The schedule must continue from the SOC of the last executed hour
+    last = max(inputs["executed"], default=0)
+    if 0 < last < len(soc):
+        expected = soc[last - 1] - float(p_discharge[last]) + float(p_charge[last])
+        if abs(soc[last] - expected) > 1e-3:
+            raise Exception(f"The SOC is not continuous after hour {last}: {soc[last - 1]} -> {soc[last]}")
+
+    return {
+        "battery_id": inputs["battery_id"],
+        "charging_status": charging_status,
+        "power": power,
+        "soc": soc,
+        "utility_power": utility_power,
+    }
+
+
+def get_pools() -> list:
+    """Get the worker pools, they are started on the first call."""
+
+    with _pools_lock:
+        if not _pools:
+            _pools.extend(create_pool() for _ in range(settings.DISPATCH_WORKERS))
+
+        return _pools
+
+
+def create_pool() -> ProcessPoolExecutor:
+    # spawn: do not fork the threads and the connections of the scheduler process
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+
+
+def restart_pool(index: int, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Replace a broken worker pool (once, by the first caller) and get the new one."""
+
+    with _pools_lock:
+        if _pools[index] is broken:
+            # the pending futures of a broken pool are already failed, only its
+            # management thread and its dead worker are released
+            broken.shutdown(wait=False)
+            _pools[index] = create_pool()
+
+        return _pools[index]
+
+
+def dispatch_fleet(fleet_inputs: list) -> list:
+    """Calculate the daily dispatch of the batteries in parallel.
+
+    A failed battery is logged and skipped, it does not stop the others. If the
+    worker of a battery dies, the worker is restarted and the battery is retried once.
+
+    Parameters
+    ----------
+    fleet_inputs : list
+        The inputs of each battery (see ``dispatch_battery``).
+
+    Returns
+    -------
+    list
+        The results of the succeeded batteries (see ``dispatch_battery``).
+    """
+
+    pools = list(get_pools())
+    futures = [
+        (inputs, pools[inputs["battery_id"] % len(pools)].submit(dispatch_battery, inputs))
+        for inputs in fleet_inputs
+    ]
+    results = []
+
+    for inputs, future in futures:
+        battery_id = inputs["battery_id"]
+        index = battery_id % len(pools)
+
+        try:
+            results.append(future.result())
+            continue
+
+        except BrokenProcessPool:
+            logger.error("The worker of battery %s died, it is restarted and the battery is retried", battery_id)
+            pools[index] = restart_pool(index, pools[index])
+
+        except Exception as exc:
+            logger.error("A problem in dispatching battery %s: %s", battery_id, exc)
+            continue
+
+        try:
+            results.append(pools[index].submit(dispatch_battery, inputs).result())
+
+        except BrokenProcessPool:
+            logger.error("The worker of battery %s died again, the battery is not dispatched", battery_id)
+            pools[index] = restart_pool(index, pools[index])
+
+        except Exception as exc:
+            logger.error("A problem in dispatching battery %s: %s", battery_id, exc)
+
+    return results
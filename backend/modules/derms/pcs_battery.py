@@ -1,6 +1,8 @@
 """
 psc_battery module
 """
+import threading
+
 import numpy as np
 import pytz
 from pyomo.environ import (
@@ -12,7 +14,6 @@ from pyomo.environ import (
     Param,
     RangeSet,
     Set,
-    SolverFactory,
     Var,
     value,
 )
@@ -21,33 +22,54 @@ from backend import configs
 from backend.modules.derms import settings
 
 from .logger import logger
+from .pcs_milp import PCSBatteryMILP
+from .solvers import solve
+from .utils import get_programs_windows
 
 tz = pytz.timezone(configs.TIMEZONE)  # consider time zone
 
+# long-lived PCS models, one per battery (see ``get_pcs_battery``)
+_models = {}
+_models_lock = threading.Lock()
+
 
 class PCSBattery:
+    """PCS battery dispatch model.
+
+    The pyomo model is built once per battery; loads, programs and the initial SOC are
+    stored in mutable parameters and fixed binaries, so a reschedule only patches the
+    changed inputs (see ``update``) and calls the solver again.
+    """
+
     def __init__(self, load: dict, battery_features: dict, programs: list, **kwargs):
         logger.info("Loading input data...")
         # Define battery attributes
+        self.features = {k: v for k, v in battery_features.items() if k != "soc_available"}
         self.soc_max = battery_features.get("soc_max")
         self.soc_min = battery_features.get("soc_min_coef") * self.soc_max
-        self.soc_available = battery_features.get("soc_available")
         self.p_max = battery_features.get("p_max")
         self.p_charge_max = battery_features.get("p_charge_max")
         self.feeder_max = battery_features.get("feeder_max")
         self.charging_margin = battery_features.get("charging_margin")
-        self.init_soc = self.soc_available
 
-        self.costdch_init = {}
         self.costch_init = {}
         self.costgr_init = {}
+        self.active_times = set()
+        self.first_active_time = []
+        self.executed = {}
+        self.solved = False
+
+        # serializes the update/solve cycle of the shared model
+        self.lock = threading.Lock()
 
         # Create the concrete model
         self.model = ConcreteModel(name="PCS")
         self.model.times = RangeSet(1, 24)
 
         self.model.non_charging_times = Set()
-        self.model.Load = Param(self.model.times, initialize=load)
+        self.model.Load = Param(self.model.times, initialize=0, mutable=True)
+        self.model.load_max = Param(self.model.times, initialize=0, mutable=True)
+        self.model.init_soc = Param(initialize=0, mutable=True)
 
         self.model.first_chargingـtimes = RangeSet(
             battery_features.get("first_chargingـtimes_st"),
@@ -59,35 +81,7 @@ class PCSBattery:
             battery_features.get("second_chargingـtimes_et"),
         )
 
-        inactive_times = RangeSet(1, 24)
-        self.cost_coef = []
-
-        for item in programs:
-
-            pgrm = dict()
-            pgrm["name"] = item.get("name")
-            pgrm["coef"] = settings.PROGRAMS_COEF_MAPPER[item.get("coef")]
-            pgrm["active_time"] = RangeSet(item.get("start"), item.get("end")) if item["activator"] else []
-            inactive_times -= pgrm["active_time"] if item["activator"] else []
-            self.cost_coef.append(pgrm)
-
-        self.model.inactive_times = inactive_times
-
-        # # Sort programs based on coef
-        self.cost_coef.sort(key=self.get_costcoef)
-
-        load_max_init = {k: min(self.p_max, v) for k, v in load.items()}
-        self.model.load_max = Param(self.model.times, initialize=load_max_init)
-
-        costdch = np.zeros(24, dtype="int64")
-
-        for item in self.cost_coef:
-            for i in item.get("active_time", []):
-                costdch[i - 1] = item["coef"]
-
-        costdch_init = dict(enumerate(costdch.flatten(), 1))
-
-        self.model.costdch = Param(self.model.times, initialize=costdch_init)
+        self.model.costdch = Param(self.model.times, initialize=0, mutable=True)
 
         for i in self.model.times:
             if i in self.model.first_chargingـtimes:
@@ -101,10 +95,9 @@ class PCSBattery:
                 self.costgr_init[i] = settings.grid_coef
                 self.model.non_charging_times.add(i)
 
-        self.model.costch = Param(self.model.times, initialize=self.costch_init)
-        self.model.costgr = Param(self.model.times, initialize=self.costgr_init)
+        self.model.costch = Param(self.model.times, initialize=self.costch_init, mutable=True)
+        self.model.costgr = Param(self.model.times, initialize=self.costgr_init, mutable=True)
 
-        self.model.z = Var()
         self.model.Pbch = Var(self.model.times, within=NonNegativeReals, bounds=(0.0, self.p_charge_max))
         self.model.Pbdch = Var(self.model.times, within=NonNegativeReals, bounds=(0.0, self.p_max))
         self.model.Pbchn = Var(self.model.times, within=NonNegativeReals)
@@ -143,25 +136,93 @@ class PCSBattery:
         self.model.constraint_charge2 = Constraint(self.model.times, rule=self.constraint_charge2_rule)
         self.model.constraint_charge3 = Constraint(self.model.times, rule=self.constraint_charge3_rule)
 
-        self.model.constraint_tunecharge1 = Constraint(
-            next(item["active_time"] for item in self.cost_coef if item["active_time"]),
-            rule=self.constraint_tunecharge1_rule,
-        )
+        self.model.constraint_UCbattery = Constraint(self.model.times, rule=self.constraint_UCbattery_rule)
+        self.model.constraint_SOCbattery = Constraint(self.model.times, rule=self.constraint_SOCbattery_rule)
 
-        self.model.constraint_tunecharge2 = Constraint(
-            self.model.non_charging_times, rule=self.constraint_tunecharge2_rule
-        )
+        self.update(load=load, programs=programs, soc_available=battery_features.get("soc_available"))
+
+    def update(
+        self, load: dict = None, programs: list = None, soc_available: float = None, executed: dict = None
+    ) -> None:
+        """Patch the inputs of the model in place.
+
+        Only the given inputs are changed, the rest of the model is kept as it is.
+
+        Parameters
+        ----------
+        load : dict, optional
+            The load of each time (1..24).
+        programs : list, optional
+            The programs of the day, the binaries of the model are re-fixed based on them.
+        soc_available : float, optional
+            The available SOC at the start of the day.
+        executed : dict, optional
+            The already executed times of the day (rolling horizon), each one maps to its
+            ``p_charge``, ``p_discharge`` and ``soc``. An empty dict optimizes all the times.
+        """
+
+        if load is not None:
+            self.model.Load.store_values(load)
+            self.model.load_max.store_values({k: min(self.p_max, v) for k, v in load.items()})
+
+        if soc_available is not None:
+            self.model.init_soc = soc_available
+
+        if programs is not None:
+            costdch, self.active_times, self.first_active_time = get_programs_windows(programs)
+            self.model.costdch.store_values(dict(enumerate(costdch.tolist(), 1)))
+            self.fix_binaries()
+
+        if executed is not None:
+            self.executed = executed
+
+        # the fixed grid power of the executed times depends on the load
+        if executed is not None or (load is not None and self.executed):
+            self.fix_executed()
+
+    def fix_binaries(self) -> None:
+        """Fix the charge/discharge binaries which are forced to zero by the programs.
+
+        - no charging during the first activated program and the non charging times.
+        - no discharging out of the activated programs.
+        """
+
+        for t in self.model.times:
+            if t in self.model.non_charging_times or t in self.first_active_time:
+                self.model.Ubch[t].fix(0)
+            else:
+                self.model.Ubch[t].unfix()
 
-        self.model.constraint_tunedischarge1 = Constraint(
-            self.model.inactive_times, rule=self.constraint_tunedischarge1_rule
-        )
+            if t in self.active_times:
+                self.model.Ubdch[t].unfix()
+            else:
+                self.model.Ubdch[t].fix(0)
 
-        self.model.constraint_UCbattery = Constraint(self.model.times, rule=self.constraint_UCbattery_rule)
-        self.model.constraint_SOCbattery = Constraint(self.model.times, rule=self.constraint_SOCbattery_rule)
+    def fix_executed(self) -> None:
+        """Fix the already executed times as constants.
 
-    @staticmethod
-    def get_costcoef(coeffient):
-        return coeffient.get("coef")
+        Their constraints are deactivated and their charge, discharge, grid and SOC
+        values are fixed, so only the remaining times of the day are optimized.
+        """
+
+        constraints = list(self.model.component_objects(Constraint))
+
+        for t in self.model.times:
+            item = self.executed.get(t)
+
+            if item is None:
+                for var in (self.model.Pbch, self.model.Pbdch, self.model.Pg, self.model.soc):
+                    var[t].unfix()
+                for constraint in constraints:
+                    constraint[t].activate()
+                continue
+
+            self.model.Pbch[t].fix(item["p_charge"])
+            self.model.Pbdch[t].fix(item["p_discharge"])
+            self.model.Pg[t].fix(max(0, value(self.model.Load[t]) + item["p_charge"] - item["p_discharge"]))
+            self.model.soc[t].fix(item["soc"])
+            for constraint in constraints:
+                constraint[t].deactivate()
 
     @staticmethod
     def obj_rule(model):
@@ -186,13 +247,13 @@ class PCSBattery:
         if t > 1:
             return model.soc[t - 1] - model.load_max[t] <= settings.M * model.bdch[t]
         else:
-            return self.init_soc - model.load_max[t] <= settings.M * model.bdch[t]
+            return model.init_soc - model.load_max[t] <= settings.M * model.bdch[t]
 
     def constraint_lindch2_rule(self, model, t):
         if t > 1:
             return model.load_max[t] - model.soc[t - 1] <= settings.M * (1 - model.bdch[t])
         else:
-            return model.load_max[t] - self.init_soc <= settings.M * (1 - model.bdch[t])
+            return model.load_max[t] - model.init_soc <= settings.M * (1 - model.bdch[t])
 
     @staticmethod
     def constraint_lindch3_rule(model, t):
@@ -202,7 +263,7 @@ class PCSBattery:
         if t > 1:
             return model.Pbdchn[t] <= model.soc[t - 1]
         else:
-            return model.Pbdchn[t] <= self.init_soc
+            return model.Pbdchn[t] <= model.init_soc
 
     @staticmethod
     def constraint_lindch5_rule(model, t):
@@ -212,7 +273,7 @@ class PCSBattery:
         if t > 1:
             return model.Pbdchn[t] >= model.soc[t - 1] - settings.M * model.bdch[t]
         else:
-            return model.Pbdchn[t] >= self.init_soc - settings.M * model.bdch[t]
+            return model.Pbdchn[t] >= model.init_soc - settings.M * model.bdch[t]
 
     def constraint_discharge1_rule(self, model, t):
         return model.Pbdch[t] <= model.Ubdch[t] * settings.M
@@ -228,13 +289,13 @@ class PCSBattery:
         if t > 1:
             return (self.soc_max - model.soc[t - 1]) - self.p_charge_max <= settings.M * model.bch[t]
         else:
-            return (self.soc_max - self.init_soc) - self.p_charge_max <= settings.M * model.bch[t]
+            return (self.soc_max - model.init_soc) - self.p_charge_max <= settings.M * model.bch[t]
 
     def constraint_linch2_rule(self, model, t):
         if t > 1:
             return self.p_charge_max - (self.soc_max - model.soc[t - 1]) <= settings.M * (1 - model.bch[t])
         else:
-            return self.p_charge_max - (self.soc_max - self.init_soc) <= settings.M * (1 - model.bch[t])
+            return self.p_charge_max - (self.soc_max - model.init_soc) <= settings.M * (1 - model.bch[t])
 
     def constraint_linch3_rule(self, model, t):
         return model.Pbchn[t] <= self.p_charge_max
@@ -243,7 +304,7 @@ class PCSBattery:
         if t > 1:
             return model.Pbchn[t] <= (self.soc_max - model.soc[t - 1])
         else:
-            return model.Pbchn[t] <= (self.soc_max - self.init_soc)
+            return model.Pbchn[t] <= (self.soc_max - model.init_soc)
 
     def constraint_linch5_rule(self, model, t):
         return model.Pbchn[t] >= self.p_charge_max - settings.M * (1 - model.bch[t])
@@ -252,7 +313,7 @@ class PCSBattery:
         if t > 1:
             return model.Pbchn[t] >= (self.soc_max - model.soc[t - 1]) - settings.M * model.bch[t]
         else:
-            return model.Pbchn[t] >= (self.soc_max - self.init_soc) - settings.M * model.bch[t]
+            return model.Pbchn[t] >= (self.soc_max - model.init_soc) - settings.M * model.bch[t]
 
     def constraint_charge1_rule(self, model, t):
         return model.Pbch[t] <= model.Ubch[t] * settings.M
@@ -264,18 +325,6 @@ class PCSBattery:
     def constraint_charge3_rule(self, model, t):
         return model.Pbch[t] >= model.Pbchn[t] - settings.M * (1 - model.Ubch[t])
 
-    @staticmethod
-    def constraint_tunecharge1_rule(model, t):
-        return model.Ubch[t] == 0
-
-    @staticmethod
-    def constraint_tunecharge2_rule(model, t):
-        return model.Ubch[t] == 0
-
-    @staticmethod
-    def constraint_tunedischarge1_rule(model, t):
-        return model.Ubdch[t] == 0
-
     @staticmethod
     def constraint_UCbattery_rule(model, t):
         return model.Ubch[t] + model.Ubdch[t] <= 1
@@ -284,9 +333,52 @@ class PCSBattery:
         if t > 1:
             return model.soc[t] == model.soc[t - 1] - model.Pbdch[t] + model.Pbch[t]
         else:
-            return model.soc[t] == self.init_soc - model.Pbdch[t] + model.Pbch[t]
+            return model.soc[t] == model.init_soc - model.Pbdch[t] + model.Pbch[t]
 
     def calculate_pcs_battery_consumption(self):
         logger.info("Try to found the solution...")
-        solver = SolverFactory("glpk")  # GNU linear programming Kit
-        solver.solve(self.model)
+        # the previous solution (binaries included) is kept in the model, use it as the
+        # starting point of the next solves
+        solve(self.model, warmstart=self.solved)
+        self.solved = True
+
+        self.objective = value(self.model.obj)
+        self.p_charge = np.array([value(self.model.Pbch[t]) for t in self.model.times])
+        self.p_discharge = np.array([value(self.model.Pbdch[t]) for t in self.model.times])
+        self.soc = np.array([value(self.model.soc[t]) for t in self.model.times])
+
+
+PCS_BACKENDS = {"pyomo": PCSBattery, "matrix": PCSBatteryMILP}
+
+
+def get_pcs_battery(key, battery_features: dict) -> PCSBattery:
+    """Return the long-lived PCS model of a battery.
+
+    The model is built on the first call (or when the battery features change) and
+    reused afterwards, callers patch it with ``PCSBattery.update`` while holding
+    ``PCSBattery.lock``. The model class is picked by ``settings.PCS_BACKEND``.
+
+    Parameters
+    ----------
+    key
+        The battery identifier (e.g. the battery id).
+    battery_features : dict
+        The battery features, ``soc_available`` is the only one which may change
+        between the calls without rebuilding the model.
+
+    Returns
+    -------
+    PCSBattery or PCSBatteryMILP
+    """
+
+    backend = PCS_BACKENDS[settings.PCS_BACKEND]
+    features = {k: v for k, v in battery_features.items() if k != "soc_available"}
+
+    with _models_lock:
+        pcs_battery = _models.get(key)
+
+        if pcs_battery is None or type(pcs_battery) is not backend or pcs_battery.features != features:
+            pcs_battery = backend(load=dict.fromkeys(range(1, 25), 0), battery_features=battery_features, programs=[])
+            _models[key] = pcs_battery
+
+        return pcs_battery
@@ -0,0 +1,283 @@
+"""
+pcs_milp module
+
+The PCS dispatch problem of ``PCSBattery`` written directly as sparse matrices and
+solved in-process by HiGHS (``scipy.optimize.milp``).
+"""
+import threading
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from backend.modules.derms import settings
+
+from .logger import logger
+from .utils import get_programs_windows
+
+T = 24  # number of the times
+
+# the column blocks of the decision vector, each one has T columns
+VARIABLES = ("Pbch", "Pbdch", "Pbchn", "Pbdchn", "soc", "Pg", "Ubch", "Ubdch", "bch", "bdch")
+BINARIES = ("Ubch", "Ubdch", "bch", "bdch")
+
+
+class PCSBatteryMILP:
+    """PCS battery dispatch model as a sparse-matrix MILP.
+
+    It emits the same formulation as ``PCSBattery``, the constraint matrix only depends
+    on the battery features and is built once; the loads, programs and the initial SOC
+    are applied to the objective, the bounds and the right-hand sides (see ``update``).
+    """
+
+    def __init__(self, load: dict, battery_features: dict, programs: list, **kwargs):
+        logger.info("Loading input data...")
+        # Define battery attributes
+        self.features = {k: v for k, v in battery_features.items() if k != "soc_available"}
+        self.soc_max = battery_features.get("soc_max")
+        self.soc_min = battery_features.get("soc_min_coef") * self.soc_max
+        self.p_max = battery_features.get("p_max")
+        self.p_charge_max = battery_features.get("p_charge_max")
+        self.feeder_max = battery_features.get("feeder_max")
+        self.charging_margin = battery_features.get("charging_margin")
+
+        # serializes the update/solve cycle of the shared model
+        self.lock = threading.Lock()
+
+        times = np.arange(1, T + 1)
+        first_charging_times = (times >= battery_features.get("first_chargingـtimes_st")) & (
+            times <= battery_features.get("first_chargingـtimes_et")
+        )
+        second_charging_times = ~first_charging_times & (
+            (times >= battery_features.get("second_chargingـtimes_st"))
+            & (times <= battery_features.get("second_chargingـtimes_et"))
+        )
+        self.non_charging_times = ~(first_charging_times | second_charging_times)
+
+        self.costch = np.where(self.non_charging_times, settings.charging_coef, settings.charging_coef_modified)
+        self.costgr = np.where(second_charging_times, settings.grid_coef_modified, settings.grid_coef)
+        self.costdch = np.zeros(T)
+
+        self.load = np.zeros(T)
+        self.load_max = np.zeros(T)
+        self.init_soc = 0.0
+        self.executed = {}
+
+        self.A, self._lb, self._ub = self.build_constraints()
+        self.lower, self.upper = self.build_bounds()
+        self.integrality = np.concatenate([np.full(T, name in BINARIES, dtype="int64") for name in VARIABLES])
+
+        self.update(load=load, programs=programs, soc_available=battery_features.get("soc_available"))
+
+    @staticmethod
+    def column(name: str) -> slice:
+        """The columns of a variable block in the decision vector."""
+
+        start = VARIABLES.index(name) * T
+        return slice(start, start + T)
+
+    def build_constraints(self) -> tuple:
+        """Build the constraint matrix.
+
+        Each constraint family is a block of T rows. ``soc_prev`` stands for ``soc[t - 1]``
+        (the shift matrix), its value at the first time is the initial SOC which is moved to
+        the right-hand side in ``update``.
+
+        Returns
+        -------
+        tuple
+            - A: the sparse constraint matrix.
+            - lb, ub: the static parts of the row bounds.
+        """
+
+        M = settings.M
+        pcm = self.p_charge_max
+
+        # (terms, lower, upper), terms: {variable: coefficient}, "soc_prev" is soc[t - 1]
+        families = [
+            # electrical_balance (the load is added in update)
+            ({"Pbdch": 1, "Pg": 1, "Pbch": -1}, 0, 0),
+            # constraint_dch, constraint_ch
+            ({"Pbdch": 1, "Ubdch": -self.p_max}, -np.inf, 0),
+            ({"Pbch": 1, "Ubch": -pcm}, -np.inf, 0),
+            # constraint_lindch1..6 (load_max is added in update)
+            ({"soc_prev": 1, "bdch": -M}, -np.inf, 0),
+            ({"soc_prev": -1, "bdch": M}, -np.inf, M),
+            ({"Pbdchn": 1}, -np.inf, 0),
+            ({"Pbdchn": 1, "soc_prev": -1}, -np.inf, 0),
+            ({"Pbdchn": -1, "bdch": M}, -np.inf, M),
+            ({"Pbdchn": -1, "soc_prev": 1, "bdch": -M}, -np.inf, 0),
+            # constraint_discharge1..3
+            ({"Pbdch": 1, "Ubdch": -M}, -np.inf, 0),
+            ({"Pbdch": 1, "Pbdchn": -1}, -np.inf, 0),
+            ({"Pbdch": -1, "Pbdchn": 1, "Ubdch": M}, -np.inf, M),
+            # constraint_linch1..6
+            ({"soc_prev": -1, "bch": -M}, -np.inf, pcm - self.soc_max),
+            ({"soc_prev": 1, "bch": M}, -np.inf, M - pcm + self.soc_max),
+            ({"Pbchn": 1}, -np.inf, pcm),
+            ({"Pbchn": 1, "soc_prev": 1}, -np.inf, self.soc_max),
+            ({"Pbchn": -1, "bch": M}, -np.inf, M - pcm),
+            ({"Pbchn": -1, "soc_prev": -1, "bch": -M}, -np.inf, -self.soc_max),
+            # constraint_charge1..3
+            ({"Pbch": 1, "Ubch": -M}, -np.inf, 0),
+            ({"Pbch": 1, "Pbchn": -1}, -np.inf, 0),
+            ({"Pbch": -1, "Pbchn": 1, "Ubch": M}, -np.inf, M),
+            # constraint_UCbattery
+            ({"Ubch": 1, "Ubdch": 1}, -np.inf, 1),
+            # constraint_SOCbattery: soc[t] - soc[t - 1] + Pbdch[t] - Pbch[t] == 0
+            ({"soc": 1, "soc_prev": -1, "Pbdch": 1, "Pbch": -1}, 0, 0),
+        ]
+
+        identity = sparse.identity(T, format="csr")
+        shift = sparse.eye(T, k=-1, format="csr")
+        blocks, lb, ub = [], [], []
+
+        for terms, lower, upper in families:
+            row = [None] * len(VARIABLES)
+
+            for name, coef in terms.items():
+                index, matrix = (VARIABLES.index("soc"), shift) if name == "soc_prev" else (VARIABLES.index(name), identity)
+                row[index] = coef * matrix if row[index] is None else row[index] + coef * matrix
+
+            blocks.append([block if block is not None else sparse.csr_matrix((T, T)) for block in row])
+            lb.append(np.full(T, lower, dtype="float64"))
+            ub.append(np.full(T, upper, dtype="float64"))
+
+        self._families = families
+        return sparse.bmat(blocks, format="csr"), np.concatenate(lb), np.concatenate(ub)
+
+    def build_bounds(self) -> tuple:
+        """Build the variable bounds (the binaries forced to zero are fixed in ``update``)."""
+
+        bounds = {
+            "Pbch": (0.0, self.p_charge_max),
+            "Pbdch": (0.0, self.p_max),
+            "soc": (self.soc_min, self.soc_max),
+        }
+        lower = np.concatenate([np.full(T, bounds.get(name, (0.0, np.inf))[0]) for name in VARIABLES])
+        upper = np.concatenate(
+            [np.full(T, 1.0 if name in BINARIES else bounds.get(name, (0.0, np.inf))[1]) for name in VARIABLES]
+        )
+        return lower, upper
+
+    def update(
+        self, load: dict = None, programs: list = None, soc_available: float = None, executed: dict = None
+    ) -> None:
+        """Patch the inputs of the model in place.
+
+        Only the given inputs are changed, the rest of the model is kept as it is.
+
+        Parameters
+        ----------
+        load : dict, optional
+            The load of each time (1..24).
+        programs : list, optional
+            The programs of the day, the binaries forced to zero are fixed based on them.
+        soc_available : float, optional
+            The available SOC at the start of the day.
+        executed : dict, optional
+            The already executed times of the day (rolling horizon), each one maps to its
+            ``p_charge``, ``p_discharge`` and ``soc``. An empty dict optimizes all the times.
+        """
+
+        if load is not None:
+            for t, v in load.items():
+                self.load[t - 1] = v
+            self.load_max = np.minimum(self.p_max, self.load)
+
+        if soc_available is not None:
+            self.init_soc = soc_available
+
+        if programs is not None:
+            self.costdch, active_times, first_active_time = get_programs_windows(programs)
+            times = np.arange(1, T + 1)
+
+            self.upper[self.column("Ubch")] = np.where(
+                self.non_charging_times | np.isin(times, list(first_active_time)), 0.0, 1.0
+            )
+            self.upper[self.column("Ubdch")] = np.where(np.isin(times, list(active_times)), 1.0, 0.0)
+
+        if executed is not None:
+            self.executed = executed
+
+    def bounds(self) -> Bounds:
+        """Get the variable bounds of the current inputs.
+
+        The charge, discharge, grid and SOC values of the executed times are fixed.
+        """
+
+        lower, upper = self.lower.copy(), self.upper.copy()
+
+        for t, item in self.executed.items():
+            grid = max(0, self.load[t - 1] + item["p_charge"] - item["p_discharge"])
+
+            values = {"Pbch": item["p_charge"], "Pbdch": item["p_discharge"], "Pg": grid, "soc": item["soc"]}
+
+            for name, v in values.items():
+                index = self.column(name).start + t - 1
+                lower[index] = upper[index] = v
+
+        return Bounds(lower, upper)
+
+    def right_hand_sides(self) -> tuple:
+        """Get the row bounds of the current inputs."""
+
+        lb, ub = self._lb.copy(), self._ub.copy()
+
+        for index, (terms, _, _) in enumerate(self._families):
+            rows = slice(index * T, (index + 1) * T)
+
+            # the initial SOC is the soc_prev of the first time
+            if "soc_prev" in terms:
+                lb[rows.start] -= terms["soc_prev"] * self.init_soc
+                ub[rows.start] -= terms["soc_prev"] * self.init_soc
+
+        # electrical_balance and constraint_lindch1/2/3/5
+        lb[0:T] += self.load
+        ub[0:T] += self.load
+        for index, sign in ((3, 1), (4, -1), (5, 1), (7, -1)):
+            ub[index * T : (index + 1) * T] += sign * self.load_max
+
+        # the constraints of the executed times are dropped (free rows)
+        for t in self.executed:
+            lb[t - 1 :: T] = -np.inf
+            ub[t - 1 :: T] = np.inf
+
+        return lb, ub
+
+    def costs(self) -> np.ndarray:
+        """Get the cost vector of the current inputs."""
+
+        c = np.zeros(len(VARIABLES) * T)
+        c[self.column("Pbdch")] = -1 * self.costdch
+        c[self.column("Pbch")] = self.costch
+        c[self.column("Pg")] = self.costgr
+        return c
+
+    def calculate_pcs_battery_consumption(self):
+        logger.info("Try to found the solution...")
+        lb, ub = self.right_hand_sides()
+        highs_options = settings.PCS_SOLVER_OPTIONS.get("highs", {})
+        options = {
+            "time_limit": highs_options.get("time_limit"),
+            "mip_rel_gap": highs_options.get("mip_gap"),
+        }
+
+        res = milp(
+            self.costs(),
+            integrality=self.integrality,
+            bounds=self.bounds(),
+            constraints=LinearConstraint(self.A, lb, ub),
+            options={key: value for key, value in options.items() if value is not None},
+        )
+
+        if res.x is None:
+            raise Exception(f"No solution found: {res.message}")
+
+        if res.status == 1:
+            logger.warning("The time limit of the solver is reached, the best found solution is used")
+
+        self.objective = res.fun
+        self.p_charge = res.x[self.column("Pbch")]
+        self.p_discharge = res.x[self.column("Pbdch")]
+        self.soc = res.x[self.column("soc")]
@@ -1,6 +1,7 @@
 """
 Set the inputs of pcs_battery in this module
 """
+from backend import configs
 
 BATTERY_CAPACITY = 1250  # capacity of the desired battery kWh
 SOC_max = BATTERY_CAPACITY * 0.9  # kW   Maximum state of charge of battery, with this trick we consider SOC min
@@ -26,3 +27,21 @@ charging_coef_modified = -10  # modified charging coefficient for charging perio
 grid_coef_modified = 0  # modified Grid coefficient for charging periods (22-24)
 
 PROGRAMS_COEF_MAPPER = {1: 50000, 2: 5000, 3: 900, 4: 300, 5: 50}
+
+# the PCS dispatch backend: "pyomo" (rule-based model solved by GLPK) or "matrix"
+# (sparse matrices solved in-process by HiGHS, see pcs_milp.py)
+PCS_BACKEND = "matrix"
+
+# the solvers of the pyomo models in the order of preference (see solvers.py), the
+# in-process ones come first and GLPK (a subprocess) is the fallback
+PCS_SOLVERS = ("highs", "cbc", "glpk")
+# the options of each solver, a None value leaves the solver default; the "highs"
+# options are used by the "matrix" backend as well (it does not support threads)
+PCS_SOLVER_OPTIONS = {
+    "highs": {"time_limit": 10, "mip_gap": 0, "threads": 1},  # time_limit in seconds
+    "cbc": {"time_limit": 10, "mip_gap": 0, "threads": 1},
+    "glpk": {"time_limit": 10, "mip_gap": 0},
+}
+
+# the number of the worker processes of the fleet dispatch (see dispatch.py)
+DISPATCH_WORKERS = configs.DISPATCH_WORKERS
@@ -0,0 +1,89 @@
+"""
+solvers module
+
+Registry of the MILP solvers of the pyomo models, the first available one of
+``settings.PCS_SOLVERS`` is used.
+"""
+from pyomo.environ import SolverFactory, TerminationCondition, check_optimal_termination
+
+from backend.modules.derms import settings
+
+from .logger import logger
+
+# name: (pyomo solver, {setting: solver option})
+SOLVERS = {
+    # in-process HiGHS through the appsi interface
+    "highs": ("appsi_highs", {"time_limit": "time_limit", "mip_gap": "mip_rel_gap", "threads": "threads"}),
+    "cbc": ("cbc", {"time_limit": "sec", "mip_gap": "ratioGap", "threads": "threads"}),
+    # subprocess GNU linear programming Kit, the fallback
+    "glpk": ("glpk", {"time_limit": "tmlim", "mip_gap": "mipgap"}),
+}
+
+_solver_name = None
+
+
+def get_solver_name() -> str:
+    """Get the first available solver of ``settings.PCS_SOLVERS``.
+
+    The availability check is done once per process.
+    """
+
+    global _solver_name
+
+    if _solver_name is None:
+        for name in settings.PCS_SOLVERS:
+            if SolverFactory(SOLVERS[name][0]).available(exception_flag=False):
+                _solver_name = name
+                break
+        else:
+            raise Exception(f"None of the solvers {settings.PCS_SOLVERS} is available")
+
+        logger.info(f"{_solver_name} solver is selected")
+
+    return _solver_name
+
+
+def get_solver():
+    """Create the selected solver with its options of ``settings.PCS_SOLVER_OPTIONS``.
+
+    A new instance is created on each call, since the solver instances keep the
+    state of the last solve and the models may be solved concurrently.
+    """
+
+    name = get_solver_name()
+    factory, options = SOLVERS[name]
+    solver = SolverFactory(factory)
+
+    for key, value in settings.PCS_SOLVER_OPTIONS.get(name, {}).items():
+        if key in options and value is not None:
+            solver.options[options[key]] = value
+
+    return solver
+
+
+def solve(model, warmstart: bool = False) -> None:
+    """Solve the pyomo model and load its solution.
+
+    A feasible solution found before the time limit is accepted as well.
+
+    Parameters
+    ----------
+    model
+        The pyomo model.
+    warmstart : bool, optional
+        Start from the current values of the model variables, ignored if the solver
+        does not support it.
+    """
+
+    solver = get_solver()
+    kwargs = {"warmstart": True} if warmstart and solver.warm_start_capable() else {}
+    results = solver.solve(model, load_solutions=False, **kwargs)
+    termination_condition = results.solver.termination_condition
+
+    if check_optimal_termination(results):
+        model.solutions.load_from(results)
+    elif termination_condition == TerminationCondition.maxTimeLimit and len(results.solution):
+        logger.warning("The time limit of the solver is reached, the best found solution is used")
+        model.solutions.load_from(results)
+    else:
+        raise Exception(f"No solution found: {termination_condition}")
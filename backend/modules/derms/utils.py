@@ -0,0 +1,47 @@
+"""
+Shared helpers of the battery models
+"""
+import numpy as np
+
+from backend.modules.derms import settings
+
+
+def get_programs_windows(programs: list) -> tuple:
+    """Get the discharge costs and the active times of the programs.
+
+    Parameters
+    ----------
+    programs : list
+        The programs of the day, each one includes ``name``, ``start``, ``end``
+        (1..24, inclusive), ``activator`` and ``coef`` (the program priority).
+
+    Returns
+    -------
+    tuple
+        - costdch: the discharge cost of each time (a 24 array).
+        - active_times: the times in which at least one program is activated.
+        - first_active_time: the active times of the first program (sorted by coef).
+    """
+
+    cost_coef = []
+
+    for item in programs:
+        pgrm = dict()
+        pgrm["name"] = item.get("name")
+        pgrm["coef"] = settings.PROGRAMS_COEF_MAPPER[item.get("coef")]
+        pgrm["active_time"] = range(item.get("start"), item.get("end") + 1) if item["activator"] else []
+        cost_coef.append(pgrm)
+
+    # # Sort programs based on coef
+    cost_coef.sort(key=lambda coeffient: coeffient.get("coef"))
+
+    costdch = np.zeros(24, dtype="int64")
+
+    for item in cost_coef:
+        for i in item.get("active_time", []):
+            costdch[i - 1] = item["coef"]
+
+    active_times = {i for item in cost_coef for i in item["active_time"]}
+    first_active_time = next((item["active_time"] for item in cost_coef if item["active_time"]), [])
+
+    return costdch, active_times, first_active_time
@@ -0,0 +1,43 @@
+"""
+Generated registry of the app components (see ``backend.magic``), do not edit.
+
+Run ``flask registry`` after adding a blueprint, a model, a serializer or a command.
+"""
+
+BLUEPRINTS = [
+    "backend.extensions.blueprints:activation",
+    "backend.extensions.blueprints:alarm",
+    "backend.extensions.blueprints:battery",
+    "backend.extensions.blueprints:program",
+    "backend.extensions.blueprints:root",
+]
+
+MODELS = [
+    "backend.models:Activation",
+    "backend.models:Alarm",
+    "backend.models:Battery",
+    "backend.models:BatteryDetails",
+    "backend.models:Load",
+    "backend.models:ManualLoad",
+    "backend.models:PowerQuality",
+    "backend.models:Program",
+    "backend.models:Result",
+]
+
+SERIALIZERS = [
+    "backend.serializers:ActivationSchema",
+    "backend.serializers:AlarmSchema",
+    "backend.serializers:BatteryDetailsSchema",
+    "backend.serializers:BatterySchema",
+    "backend.serializers:LoadSchema",
+    "backend.serializers:ManualLoadSchema",
+    "backend.serializers:PowerQualitySchema",
+    "backend.serializers:ProgramSchema",
+    "backend.serializers:ResultSchema",
+]
+
+COMMANDS = [
+    "backend.commands:cache",
+    "backend.commands:import_time",
+    "backend.commands:registry",
+]
@@ -9,6 +9,19 @@ from backend.models import BatteryDetails, PowerQuality, Result
 from backend.modules.derms import settings
 from backend.utils import tznow
 
+BATTERY_DETAILS_TAGS = [
+    "state_of_charge",
+    "life_cycle",
+    "state_of_health",
+    "grid_frequency",
+    "average_grid_current",
+    "grid_reactive_power",
+    "ambient_temperature",
+    "grid_power_factor",
+    "power_limit",
+    "bdc_mode",
+]
+
 
 def calculate_ambient_temperature(temperature):
     if temperature > 56:
@@ -37,9 +50,8 @@ def handle_soc_min():
     logger.debug("Try to handle SOC min...")
 
     try:
-        soc = cbiot.get_state_of_charge()
-        bdc = cbiot.get_bdc_mode()
-        pl = cbiot.get_power_limit()
+        snapshot = cbiot.get_snapshot(["state_of_charge", "bdc_mode", "power_limit"])
+        soc, bdc, pl = snapshot.state_of_charge, snapshot.bdc_mode, snapshot.power_limit
 
         if any(v is None for v in [soc, bdc, pl]):
             logger.info("SOC min can not handled, because some data is missing.")
@@ -71,16 +83,20 @@ def power_command():
 
         try:
             if result:
+                # the setpoints which are acknowledged and read back are not sent again
                 if result.charging_status == 0:
-                    cbiot.set_bdc_mode(13)
+                    sent = cbiot.apply_setpoints(bdc_mode=13, verify=True)
                 elif result.charging_status == 1:
-                    cbiot.set_bdc_mode(0)
-                    cbiot.set_power_limit(-100)
+                    sent = cbiot.apply_setpoints(bdc_mode=0, power_limit=-100, verify=True)
                 elif result.charging_status == -1:
-                    cbiot.set_bdc_mode(0)
-                    cbiot.set_power_limit(100)
-
-                logger.info("Command was sent successfully.")
+                    sent = cbiot.apply_setpoints(bdc_mode=0, power_limit=100, verify=True)
+                else:
+                    sent = {}
+
+                if sent:
+                    logger.info("Command was sent successfully.")
+                else:
+                    logger.info("The battery is already in the commanded state.")
             else:
                 return
 
@@ -102,16 +118,17 @@ def battery_details():
 
         try:
 
-            soc = cbiot.get_state_of_charge()
-            life_cycle = cbiot.get_life_cycle()
-            soh = cbiot.get_state_of_health()
-            frequency = cbiot.get_grid_frequency()
-            average_grid_current = cbiot.get_average_grid_current()
-            reactive_power = cbiot.get_grid_reactive_power()
-            ambient_temperature = cbiot.get_ambient_temperature()
-            power_factor = cbiot.get_grid_power_factor()
-            power_limit = cbiot.get_power_limit()
-            bdc = cbiot.get_bdc_mode()
+            snapshot = cbiot.get_snapshot(BATTERY_DETAILS_TAGS)
+            soc = snapshot.state_of_charge
+            life_cycle = snapshot.life_cycle
+            soh = snapshot.state_of_health
+            frequency = snapshot.grid_frequency
+            average_grid_current = snapshot.average_grid_current
+            reactive_power = snapshot.grid_reactive_power
+            ambient_temperature = snapshot.ambient_temperature
+            power_factor = snapshot.grid_power_factor
+            power_limit = snapshot.power_limit
+            bdc = snapshot.bdc_mode
             battery_status = None
 
             if bdc:
@@ -157,8 +174,8 @@ def voltage_current():
         current_facility, current_utility, current_battery = None, None, None
 
         try:
-            voltage = cbiot.get_voltage()
-            current = cbiot.get_current()
+            snapshot = cbiot.get_snapshot(["voltage", "current"])
+            voltage, current = snapshot.voltage, snapshot.current
 
         except Exception as exc:
             logger.error("failed to fetch cbiot data: %s", str(exc))
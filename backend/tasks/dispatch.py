@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from backend.api.common import get_loads
+from backend.configs import DISPATCH_CACHE_TTL, DISPATCH_LOCK_TIMEOUT, TIMEZONE
+from backend.database import on_day, session
+from backend.extensions import redis, scheduler
+from backend.logger import logger
+from backend.models import Activation, Battery, Program, Result
+from backend.utils import tznow
+
+from . import teardown_taskcontext
+
+
+def get_fleet_inputs(batteries: list, today: date, component_ids: dict = None) -> list:
+    """Get the dispatch inputs of the batteries.
+
+    The programs, the results and the loads of all the batteries are read by a few
+    queries (not per battery).
+
+    Parameters
+    ----------
+    batteries : list
+        The Battery rows.
+    today : date
+        The dispatch date.
+    component_ids : dict, optional
+        The load component id of the batteries (by battery id), by default the
+        component id of the battery.
+
+    Returns
+    -------
+    list
+        The inputs of each battery (see ``backend.modules.derms.dispatch_battery``), a
+        battery with missing load data is logged and skipped.
+    """
+
+    battery_ids = [battery.id for battery in batteries]
+    component_ids = {**{battery.id: battery.component_id for battery in batteries}, **(component_ids or {})}
+    now = tznow(TIMEZONE).hour
+    past = now + 1
+
+    # Extracting yesterday's latest values (to get the latest available soc)
+    last_results_of_yesterday = {
+        rs.battery_id: rs
+        for rs in Result.filter(
+            Result.battery_id.in_(battery_ids),
+            Result.datetime == datetime.combine(today - timedelta(days=1), time(23)),
+        )
+    }
+
+    programs = defaultdict(list)
+    activated_programs_results = (
+        session.query(Activation, Program)
+        .join(Program, Activation.program_id == Program.id)
+        .filter(Activation.date == today, Program.battery_id.in_(battery_ids))
+        .all()
+    )
+
+    for item in activated_programs_results:
+        programs[item.Program.battery_id].append(
+            {
+                "name": item.Program.name,
+                "start": int(item.Activation.start or 0) + 1,
+                "end": int(item.Activation.end or 0) + 1,
+                "activator": bool(item.Activation.status),
+                "coef": item.Program.priority,
+            }
+        )
+
+    # The hours which are already executed are kept as they are (rolling horizon)
+    executed = defaultdict(dict)
+    today_results = Result.filter(Result.battery_id.in_(battery_ids), on_day(Result.datetime, today)).all()
+
+    for rs in today_results:
+        if rs.datetime.hour < past and rs.soc is not None:
+            executed[rs.battery_id][rs.datetime.hour + 1] = {
+                "p_charge": float(rs.power or 0) if rs.charging_status == 1 else 0,
+                "p_discharge": float(rs.power or 0) if rs.charging_status == -1 else 0,
+                "soc": float(rs.soc),
+                "charging_status": rs.charging_status,
+                "power": rs.power,
+                "utility_power": rs.utility_power,
+            }
+
+    loads = {
+        component_id: [row.value for row in get_loads(today, component_id=component_id)]
+        for component_id in set(component_ids.values())
+    }
+
+    fleet_inputs = []
+
+    for battery in batteries:
+        load_values = loads[component_ids[battery.id]]
+
+        if len(load_values) != 24:
+            logger.error("Load data of battery %s is incomplete (%s values)", battery.id, len(load_values))
+            continue
+
+        last_res_of_yesterday = last_results_of_yesterday.get(battery.id)
+        fleet_inputs.append(
+            {
+                "battery_id": battery.id,
+                "battery_type": battery.battery_type,
+                "load": load_values,
+                "battery_features": {
+                    "soc_max": battery.soc_max,
+                    "soc_min_coef": battery.soc_min / battery.soc_max,
+                    "soc_available": float(last_res_of_yesterday.soc if last_res_of_yesterday else battery.soc_max),
+                    "p_max": battery.p_max,
+                    "p_charge_max": battery.p_charge_max,
+                    "feeder_max": battery.feeder_max,
+                    "charging_margin": battery.charging_margin,
+                    "first_chargingـtimes_st": battery.first_start_time,
+                    "first_chargingـtimes_et": battery.first_end_time,
+                    "second_chargingـtimes_st": battery.second_start_time,
+                    "second_chargingـtimes_et": battery.second_end_time,
+                },
+                "programs": programs[battery.id],
+                "executed": executed[battery.id],
+                "now": now,
+            }
+        )
+
+    return fleet_inputs
+
+
+def get_fingerprint(inputs: dict, today: date) -> str:
+    """Get a stable hash of the dispatch inputs of a battery.
+
+    The hash covers the date and all the inputs which the result depends on (the
+    current hour only matters to the UPS batteries, the order of the programs does
+    not matter).
+    """
+
+    fingerprint = {key: value for key, value in inputs.items() if key != "now" or inputs["battery_type"] == "UPS"}
+    fingerprint["programs"] = sorted(inputs["programs"], key=lambda item: (item["coef"], item["name"]))
+    payload = json.dumps({"date": today.isoformat(), **fingerprint}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cache_key(battery_id: int, today: date) -> str:
+    """Get the cache key of the fingerprint of the last saved dispatch of a battery."""
+
+    return f"dispatch:{battery_id}:{today.isoformat()}"
+
+
+def get_changed_inputs(fleet_inputs: list, today: date) -> list:
+    """Drop the batteries whose inputs are the same as their last saved dispatch.
+
+    Only the fingerprint of the last saved dispatch of each battery (of the day) is
+    kept, so the inputs which change back to an older state are dispatched again.
+
+    Parameters
+    ----------
+    fleet_inputs : list
+        The inputs of each battery (see ``backend.modules.derms.dispatch_battery``).
+    today : date
+        The dispatch date.
+
+    Returns
+    -------
+    list
+        The inputs which need a dispatch.
+    """
+
+    if not fleet_inputs:
+        return []
+
+    saved = redis.mget([get_cache_key(inputs["battery_id"], today) for inputs in fleet_inputs])
+    changed = [
+        inputs
+        for inputs, fingerprint in zip(fleet_inputs, saved)
+        if fingerprint is None or fingerprint.decode() != get_fingerprint(inputs, today)
+    ]
+
+    if len(changed) < len(fleet_inputs):
+        logger.info("%s batteries have the same inputs as their last dispatch", len(fleet_inputs) - len(changed))
+
+    return changed
+
+
+def cache_results(fleet_inputs: list, results: list, today: date) -> None:
+    """Keep the fingerprint of the inputs of the saved dispatch results (see ``get_changed_inputs``)."""
+
+    inputs_of_batteries = {inputs["battery_id"]: inputs for inputs in fleet_inputs}
+    pipeline = redis.pipeline()
+
+    for result in results:
+        fingerprint = get_fingerprint(inputs_of_batteries[result["battery_id"]], today)
+        pipeline.set(get_cache_key(result["battery_id"], today), fingerprint, ex=DISPATCH_CACHE_TTL)
+
+    pipeline.execute()
+
+
+def save_fleet_results(results: list, today: date) -> None:
+    """Save the dispatch results of the batteries by one commit.
+
+    The hourly rows of all the batteries are upserted by ``(datetime, battery_id)``
+    (see ``BaseModel.bulk_upsert``), the existing rows are not read first.
+
+    Parameters
+    ----------
+    results : list
+        The results of each battery (see ``backend.modules.derms.dispatch_battery``).
+    today : date
+        The dispatch date.
+    """
+
+    if not results:
+        return
+
+    rows = [
+        {
+            "battery_id": result["battery_id"],
+            "datetime": datetime.combine(today, time(i, 0)),
+            "charging_status": result["charging_status"][i],
+            "power": result["power"][i],
+            "soc": result["soc"][i],
+            "utility_power": result["utility_power"][i],
+        }
+        for result in results
+        for i in range(24)
+    ]
+
+    Result.bulk_upsert(rows, conflict_keys=["datetime", "battery_id"], commit=True)
+
+
+@teardown_taskcontext
+def fleet_dispatch() -> None:
+    """Calculate and save the daily dispatch of all the batteries.
+
+    The problem of each battery is built from its own Battery row and the problems
+    are solved in parallel by the worker processes. The scheduler runs in every web
+    worker, the dispatch of each hour is run by the first one (a Redis key).
+    """
+
+    now = tznow(TIMEZONE)
+    if not redis.set(f"fleet-dispatch:{now:%Y-%m-%dT%H}", os.getpid(), nx=True, ex=DISPATCH_LOCK_TIMEOUT):
+        logger.info("The batteries are dispatched by another process")
+        return
+
+    # the optimizers are imported on the first dispatch, not by the web workers
+    from backend.modules.derms import dispatch_fleet
+
+    logger.info("Trying to dispatch the batteries...")
+
+    with scheduler.app.app_context():
+        today = now.date()
+        fleet_inputs = get_changed_inputs(get_fleet_inputs(Battery.all(), today), today)
+        results = dispatch_fleet(fleet_inputs)
+        save_fleet_results(results, today)
+        cache_results(fleet_inputs, results, today)
+
+        logger.info("%s of %s batteries are dispatched", len(results), len(fleet_inputs))
@@ -1,11 +1,12 @@
 import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
 from datetime import datetime, timedelta
 from random import randint
 from time import sleep
 
 from dateutil import parser
 
-from backend.configs import DEMAND_RESPONSE_ZONE, TIMEZONE
+from backend.configs import DEMAND_RESPONSE_ZONE, LOAD_FETCH_TIMEOUT, LOAD_FETCH_WORKERS, TIMEZONE
 from backend.database import session
 from backend.extensions import redis, scheduler
 from backend.extensions.core_api import core_api
@@ -24,6 +25,14 @@ from .utils import (
 
 @teardown_taskcontext
 def get_loads() -> None:
+    """Fetch and save the updated baselines of the battery components.
+
+    The components are fetched concurrently (at most ``LOAD_FETCH_WORKERS`` at once)
+    and saved as they arrive; a failed component does not stop the others and the
+    components which are not fetched before ``LOAD_FETCH_TIMEOUT`` are skipped until
+    the next run.
+    """
+
     logger.info("Trying to get loads data...")
 
     with scheduler.app.app_context():
@@ -39,50 +48,39 @@ def get_loads() -> None:
                 row.component_id
                 for row in session.query(Battery.component_id).distinct()
             ]
+            load_cache_data = json.loads(redis.get("LOAD")) if redis.exists("LOAD") else {}
+
+            executor = ThreadPoolExecutor(max_workers=LOAD_FETCH_WORKERS)
+            futures = {
+                executor.submit(
+                    fetch_component_loads, comp_id, start_date, end_date, load_cache_data.get(str(comp_id))
+                ): comp_id
+                for comp_id in comp_list
+            }
 
-            if redis.exists("LOAD"):
-                load_cache_data = json.loads(redis.get("LOAD"))
+            try:
+                # The database is only touched by this thread
+                for future in as_completed(futures, timeout=LOAD_FETCH_TIMEOUT):
+                    comp_id = futures[future]
 
-                for comp_id in comp_list:
                     try:
-                        cached_last_update = load_cache_data.get(str(comp_id))
-                        comp_last_update = core_api.get_last_update(
-                            name="Baseline", component_id=comp_id
-                        )
-                        new_last_update = comp_last_update.get("result", {}).get(
-                            "lastUpdate"
-                        )
-
-                        if parser.parse(new_last_update) > parser.parse(
-                            cached_last_update
-                        ):
-                            update_load_cache(comp_id, new_last_update)
-                            comp_values = core_api.get_component_data(
-                                start=start_date, end=end_date, component_id=comp_id
-                            )
+                        last_update, comp_values = future.result()
 
+                        if comp_values is not None:
                             update_load_table(comp_id, comp_values)
+                            update_load_cache(comp_id, last_update)
 
                     except Exception as exc:
-                        continue
+                        logger.error("A problem in gathering load data of component %s: %s", comp_id, exc)
 
-            else:
-                for comp_id in comp_list:
-                    comp_values = core_api.get_component_data(
-                        start=start_date, end=end_date, component_id=comp_id
-                    )
+            except TimeoutError:
+                pending = [comp_id for future, comp_id in futures.items() if not future.done()]
+                logger.error("Load data of components %s is not fetched in %s seconds", pending, LOAD_FETCH_TIMEOUT)
 
-                    try:
-                        comp_last_update = core_api.get_last_update(
-                            name="Baseline", component_id=comp_id
-                        )
-                        lu = comp_last_update.get("result", {}).get("lastUpdate")
-                        parser.parse(lu)
-                        update_load_cache(comp_id, lu)
-                        update_load_table(comp_id, comp_values)
-
-                    except:
-                        continue
+            finally:
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
 
             sleep(randint(1, 5))  # noexec
 
@@ -90,12 +88,72 @@ def get_loads() -> None:
             logger.error("A problem in gathering load data: %s", exc)
 
 
-def update_load_table(comp_id: int, comp_data: list):
-    for item in comp_data:
-        item_date = parser.parse(item.get("datetime"))
-        item_value = float(item.get("value"))
-        load = Load.get_or_create(datetime=item_date, component_id=comp_id)
-        load.update(commit=True, value=item_value)
+def fetch_component_loads(comp_id: int, start: str, end: str, cached_last_update: str = None) -> tuple:
+    """Fetch the baseline of a component if it is updated since its cached last update.
+
+    It only calls the core API, so it can run in a worker thread.
+
+    Returns
+    -------
+    tuple
+        The last update of the baseline and its values (None if it is not updated).
+    """
+
+    comp_last_update = core_api.get_last_update(name="Baseline", component_id=comp_id)
+    last_update = comp_last_update.get("result", {}).get("lastUpdate")
+
+    if cached_last_update and parser.parse(last_update) <= parser.parse(cached_last_update):
+        return last_update, None
+
+    return last_update, core_api.get_component_data(start=start, end=end, component_id=comp_id)
+
+
+def update_load_table(comp_id: int, comp_data: list) -> int:
+    """Save the load values of a component by one upsert.
+
+    The timestamps are parsed at once and the values are compared with the stored
+    ones of the same range, only the new and the changed values are written.
+
+    Parameters
+    ----------
+    comp_id : int
+        The component id.
+    comp_data : list
+        The load values, each one includes ``datetime`` and ``value``.
+
+    Returns
+    -------
+    int
+        The number of the written values.
+    """
+
+    if not comp_data:
+        return 0
+
+    import pandas as pd
+
+    comp_df = pd.DataFrame(comp_data)
+    comp_df = pd.DataFrame(
+        {"datetime": pd.to_datetime(comp_df["datetime"]), "value": comp_df["value"].astype("float64")}
+    ).drop_duplicates("datetime", keep="last")
+    datetimes = comp_df["datetime"].dt.to_pydatetime()
+
+    stored = dict(
+        session.query(Load.datetime, Load.value).filter(
+            Load.component_id == comp_id,
+            Load.datetime.between(datetimes.min(), datetimes.max()),
+        )
+    )
+    rows = [
+        {"datetime": item_date, "component_id": comp_id, "value": item_value}
+        for item_date, item_value in zip(datetimes, comp_df["value"].tolist())
+        if stored.get(item_date) != item_value
+    ]
+
+    if rows:
+        Load.bulk_upsert(rows, conflict_keys=["datetime", "component_id"], commit=True)
+
+    return len(rows)
 
 
 def update_load_cache(comp_id: int, last_update: str):
@@ -1,25 +1,32 @@
 import json
 import re
-from datetime import datetime, time, timedelta
 
-import numpy as np
 from dateutil import parser
-from deepdiff import DeepDiff
 
-from backend.api.common import get_loads
 from backend.configs import TIMEZONE
-from backend.database import func
+from backend.database import on_day
 from backend.extensions import redis
 from backend.logger import logger
-from backend.models import Action, Activation, Alarm, Load, Result, Program
-from backend.modules.derms import PCSBattery, settings
+from backend.models import Action, Activation, Alarm, Battery, Program
 from backend.utils import tznow
 
+from .dispatch import cache_results, get_changed_inputs, get_fleet_inputs, save_fleet_results
 
-def calculate_pcs_battery_consumption() -> None:
+
+def calculate_pcs_battery_consumption(comp_id: int, battery_id: int) -> None:
     """Calculate battery charge and discharge values
 
-    Based on load values and activated programs
+    Based on load values and activated programs, the long-lived PCS model of the
+    battery is patched with the new inputs and solved again. The hours of the day
+    which already have results are fixed, only the remaining hours are re-optimized.
+    Nothing is solved or written if the inputs are the same as its last saved dispatch.
+
+    Parameters
+    ----------
+    comp_id : int
+        The component id of the battery load.
+    battery_id : int
+        The battery id.
 
     Raises
     ------
@@ -27,153 +34,23 @@ def calculate_pcs_battery_consumption() -> None:
         No load data found.
     """
 
-    # Extracting yesterday's latest values (to get the latest available soc)
-    last_res_of_yesterday = Result.get_by(
-        datetime=datetime.combine(
-            (tznow(TIMEZONE) - timedelta(days=1)).date(), time(23)
-        )
-    )
-
-    activated_programs_results = (
-        Activation.filter(func.date(Activation.date) == tznow(TIMEZONE).date())
-        .order_by(Activation.date)
-        .all()
-    )
-
-    activated_programs = dict()
-    for item in activated_programs_results:
-        activated_programs[item.name.lower()] = {
-            "status": item.status,
-            "activation": {"start": item.start, "end": item.end},
-        }
-
-    load_consumption = get_loads(tznow(TIMEZONE).date())
-    load_values = [item["value"] for item in load_consumption]
-
-    if load_values:
-        input_loads = load_values
-        pcs_battery = PCSBattery(
-            SOC_max=int(settings.SOC_max),
-            p_max=settings.p_max,
-            SOC_available=float(
-                last_res_of_yesterday.limited_soc
-                if last_res_of_yesterday
-                else settings.SOC_max
-            ),
-            GA_START_TIME=int(
-                activated_programs.get("ga", {}).get(
-                    "activation", {}).get("start") or 0
-            )
-            + 1,
-            GA_END_TIME=int(
-                activated_programs.get("ga", {}).get(
-                    "activation", {}).get("end") or 0
-            )
-            + 1,
-            DR_START_TIME=int(
-                activated_programs.get("dr", {}).get(
-                    "activation", {}).get("start") or 0
-            )
-            + 1,
-            DR_END_TIME=int(
-                activated_programs.get("dr", {}).get(
-                    "activation", {}).get("end") or 0
-            )
-            + 1,
-            HOEP_START_TIME=int(
-                activated_programs.get("hoep", {}).get(
-                    "activation", {}).get("start")
-                or 0
-            )
-            + 1,
-            HOEP_END_TIME=int(
-                activated_programs.get("hoep", {}).get(
-                    "activation", {}).get("end") or 0
-            )
-            + 1,
-            GA_STATUS=int(activated_programs.get(
-                "ga", {}).get("status", False)),
-            DR_STATUS=int(activated_programs.get(
-                "dr", {}).get("status", False)),
-            HOEP_STATUS=int(activated_programs.get(
-                "hoep", {}).get("status", False)),
-            Load=input_loads,
-            CHARGING_START_TIME1=settings.CHARGING_START_TIME1,
-            CHARGING_END_TIME1=settings.CHARGING_END_TIME1,
-            CHARGING_START_TIME2=settings.CHARGING_START_TIME2,
-            CHARGING_END_TIME2=settings.CHARGING_END_TIME2,
-            feeder_max=settings.feeder_max,
-            charging_margin=settings.charging_margin,
-            charge_max=settings.charge_max,
-        )
+    # the optimizers are imported on the first dispatch, not by the web workers
+    from backend.modules.derms import dispatch_battery
 
-        pcs_battery.check_program_activation()
+    today = tznow(TIMEZONE).date()
+    fleet_inputs = get_fleet_inputs([Battery.get(battery_id)], today, component_ids={battery_id: comp_id})
 
-        charging_status = np.zeros(24, dtype="int32")
-        charging_status[pcs_battery.p_discharge != 0] = -1
-        charging_status[pcs_battery.p_charge != 0] = 1
-        charging_status = charging_status.tolist()
+    if not fleet_inputs:
+        raise Exception("Load data of the day is incomplete")
 
-        charging_modes = pcs_battery.daily_activity_hours().tolist()
-        power = np.abs(
-            (pcs_battery.p_charge + pcs_battery.p_discharge).round(4)
-        ).tolist()
-        limited_soc = np.abs(pcs_battery.soc.round(4)).tolist()
+    fleet_inputs = get_changed_inputs(fleet_inputs, today)
 
-        utility_power = [
-            (a * b) + c for a, b, c in zip(charging_status, power, input_loads)
-        ]
-
-        # Get all the results for today
-        today_results = (
-            Result.filter(func.date(Result.datetime) == tznow(TIMEZONE).date())
-            .order_by(Result.datetime)
-            .all()
-        )
+    if not fleet_inputs:
+        return
 
-        # Check if is not first time to save results to DB
-        if today_results:
-            charging_status_old = [rs.charging_status for rs in today_results]
-            charging_mode_old = [rs.charging_mode for rs in today_results]
-            power_old = [rs.power for rs in today_results]
-            limited_soc_old = [rs.limited_soc for rs in today_results]
-            utility_power_old = [rs.utility_power for rs in today_results]
-
-            # Update the new calculated results with the previous results
-            charging_status[: tznow(TIMEZONE).hour + 1] = charging_status_old[
-                : tznow(TIMEZONE).hour + 1
-            ]
-            charging_modes[: tznow(TIMEZONE).hour + 1] = charging_mode_old[
-                : tznow(TIMEZONE).hour + 1
-            ]
-            power[: tznow(TIMEZONE).hour +
-                  1] = power_old[: tznow(TIMEZONE).hour + 1]
-            limited_soc[: tznow(TIMEZONE).hour + 1] = limited_soc_old[
-                : tznow(TIMEZONE).hour + 1
-            ]
-            utility_power[: tznow(TIMEZONE).hour + 1] = utility_power_old[
-                : tznow(TIMEZONE).hour + 1
-            ]
-
-        real_soc = [x + (settings.BATTERY_CAPACITY * 0.1) for x in limited_soc]
-
-        # Save results for the first time
-        for i in range(24):
-            res = Result.get_or_create(
-                datetime=datetime.combine(tznow(TIMEZONE).date(), time(i, 0))
-            )
-            res.update(
-                commit=True,
-                charging_status=charging_status[i],
-                charging_mode=charging_modes[i],
-                power=power[i],
-                limited_soc=limited_soc[i],
-                real_soc=real_soc[i],
-                utility_power=utility_power[i],
-            )
-
-    else:
-        raise Exception("No load data found")
+    results = [dispatch_battery(fleet_inputs[0])]
+    save_fleet_results(results, today)
+    cache_results(fleet_inputs, results, today)
 
 
 def get_dict_diff(new_data: dict, old_data: dict):
@@ -189,6 +66,8 @@ def get_dict_diff(new_data: dict, old_data: dict):
     changes: dict
     """
 
+    from deepdiff import DeepDiff
+
     changes = {}
     excluded_regex = r"'(.*?)'"
     diff = DeepDiff(new_data, old_data)
@@ -212,6 +91,8 @@ def get_list_diff(new_data: list, old_data: list):
     changes: dict
     """
 
+    from deepdiff import DeepDiff
+
     changes = {}
     excluded_regex = r"\[(.*?)\]"
     diff = DeepDiff(new_data, old_data)
@@ -232,8 +113,10 @@ def daily_activity_hours() -> list:
     -------
     activation_mode: list
     """
+    import numpy as np
+
     activated_programs_results = (
-        Activation.filter(func.date(Activation.date) == tznow(TIMEZONE).date())
+        Activation.filter(on_day(Activation.date, tznow(TIMEZONE).date()))
         .order_by(Activation.date)
         .all()
     )
@@ -1,4 +1,5 @@
 from .date import tznow
+from .http import create_session
 from .misc import log_expection, pluralize, send_error_response, slugify, title_case
 from .requests import get_token_from_request, get_value_from_request_by_key
 from .url import is_safe_url
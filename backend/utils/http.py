@@ -0,0 +1,115 @@
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import Retrying, retry_if_exception, retry_if_result, stop_after_attempt, stop_after_delay, wait_exponential
+from urllib3.exceptions import NewConnectionError
+
+from backend.configs import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_RETRY_DEADLINE
+
+logger = logging.getLogger("http")
+
+# the responses of a temporarily unavailable server, they are retried
+RETRY_STATUSES = (502, 503, 504)
+
+# the methods which can be sent twice without a side effect
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def is_not_sent(exc: BaseException) -> bool:
+    """Check if a request failed before it was sent (the connection was not made)."""
+
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+
+    reason = getattr(exc.args[0], "reason", exc.args[0]) if exc.args else None
+    return isinstance(exc, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Check if a request failed by a connection error or a timeout."""
+
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+class HTTPSession(requests.Session):
+    """
+    A requests session with default timeouts and retries.
+
+    The requests of the ``IDEMPOTENT_METHODS`` are retried on the connection errors,
+    the timeouts and the ``RETRY_STATUSES`` responses. The other requests (e.g. a
+    login or a command) may be applied by the server, they are only retried if they
+    were not sent. The retries use exponential backoff and stop after ``deadline``
+    seconds, the last response (or error) is returned.
+
+    Parameters
+    ----------
+    timeout : tuple
+        The default (connect, read) timeouts in seconds.
+    retries : int
+        The number of the retries of a request.
+    backoff : float
+        The first wait (seconds) between the retries, it is doubled on each one.
+    deadline : float
+        The time (seconds) after the first attempt, after which a request is not
+        retried.
+    """
+
+    def __init__(
+        self,
+        timeout: tuple = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        retries: int = HTTP_RETRIES,
+        backoff: float = 0.5,
+        deadline: float = HTTP_RETRY_DEADLINE,
+    ):
+        super().__init__()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.deadline = deadline
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        retrying = Retrying(
+            stop=stop_after_attempt(self.retries + 1) | stop_after_delay(self.deadline),
+            wait=wait_exponential(multiplier=self.backoff, max=10),
+            retry=(
+                retry_if_exception(is_transient if idempotent else is_not_sent)
+                | retry_if_result(lambda response: idempotent and response.status_code in RETRY_STATUSES)
+            ),
+            retry_error_callback=lambda state: state.outcome.result(),
+            before_sleep=lambda state: logger.warning(
+                "Retrying %s '%s' (attempt %s)", method, url, state.attempt_number
+            ),
+        )
+
+        return retrying(super().request, method, url, **kwargs)
+
+
+def create_session(pool_size: int = 10, **kwargs) -> HTTPSession:
+    """
+    Create the HTTP session of an API client.
+
+    The connections are kept alive and reused by a pool per host, which should be as
+    large as the number of the threads which use the session at once.
+
+    Parameters
+    ----------
+    pool_size : int
+        The maximum number of the kept connections per host.
+    kwargs
+        The timeouts and the retries (see ``HTTPSession``).
+
+    Returns
+    -------
+    HTTPSession
+        The session.
+    """
+
+    session = HTTPSession(**kwargs)
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
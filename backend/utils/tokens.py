@@ -0,0 +1,158 @@
+import base64
+import json
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from backend.configs import TOKEN_LIFETIME, TOKEN_REFRESH_MARGIN
+
+logger = logging.getLogger("tokens")
+
+
+def get_token_expiry(token: str, lifetime: int = TOKEN_LIFETIME) -> float:
+    """
+    Get the expiry time of a (bearer) token.
+
+    Parameters
+    ----------
+    token : str
+        The token, a JWT token expires at its ``exp`` claim.
+    lifetime : int
+        The lifetime (seconds) of the other tokens.
+
+    Returns
+    -------
+    float
+        The expiry time (epoch seconds).
+    """
+
+    try:
+        payload = token.split()[-1].split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + lifetime
+
+
+class TokenStore:
+    """
+    Redis store of an API token, shared by all the processes of the API client.
+
+    The token is refreshed ``refresh_margin`` seconds before its expiry. A refresh is
+    single-flight: it holds a Redis lock, the other processes (and threads) wait for
+    it and reuse the new token. If Redis is not available, the token is refreshed by
+    the caller itself.
+
+    Parameters
+    ----------
+    redis : redis.Redis
+        The Redis client.
+    name : str
+        The name of the token (e.g. the API and the username).
+    refresh_margin : int
+        The time (seconds) before the expiry to refresh the token.
+    lock_timeout : int
+        The maximum time (seconds) to hold or to wait for the refresh lock.
+    """
+
+    def __init__(self, redis, name: str, refresh_margin: int = TOKEN_REFRESH_MARGIN, lock_timeout: int = 30):
+        self.redis = redis
+        self.key = f"token:{name}"
+        self.refresh_margin = refresh_margin
+        self.lock_timeout = lock_timeout
+        self._entry = None
+        self._local_lock = threading.Lock()
+
+    def _is_fresh(self, entry: Optional[dict]) -> bool:
+        return entry is not None and time.time() < entry["expires_at"] - self.refresh_margin
+
+    def _read(self) -> Optional[dict]:
+        try:
+            entry = self.redis.get(self.key)
+        except Exception as exc:
+            logger.warning("The token store is not available: %s", exc)
+            return None
+
+        return json.loads(entry) if entry is not None else None
+
+    def _write(self, entry: dict) -> None:
+        try:
+            self.redis.set(self.key, json.dumps(entry), ex=max(1, int(entry["expires_at"] - time.time())))
+        except Exception as exc:
+            logger.warning("The token store is not available: %s", exc)
+
+    def _login(self, login: Callable[[], str]) -> dict:
+        token = login()
+        entry = {"token": token, "expires_at": get_token_expiry(token)}
+        self._write(entry)
+        return entry
+
+    def get(self, login: Callable[[], str]) -> str:
+        """
+        Get a valid token, it is refreshed if it is missing or about to expire.
+
+        Parameters
+        ----------
+        login : callable
+            Request a new token from the API.
+
+        Returns
+        -------
+        str
+            The token.
+        """
+
+        if self._is_fresh(self._entry):
+            return self._entry["token"]
+
+        entry = self._read()
+
+        if self._is_fresh(entry):
+            self._entry = entry
+            return entry["token"]
+
+        return self.refresh(login, stale_token=entry["token"] if entry else None)
+
+    def refresh(self, login: Callable[[], str], stale_token: Optional[str] = None) -> str:
+        """
+        Refresh the token, unless another process has already replaced the stale one.
+
+        Parameters
+        ----------
+        login : callable
+            Request a new token from the API.
+        stale_token : str, optional
+            The expired (or rejected) token.
+
+        Returns
+        -------
+        str
+            The new token.
+        """
+
+        # one thread of the process waits for the lock of all the processes
+        with self._local_lock:
+            try:
+                lock = self.redis.lock(f"{self.key}:lock", timeout=self.lock_timeout, blocking_timeout=self.lock_timeout)
+                acquired = lock.acquire()
+            except Exception as exc:
+                logger.warning("The token store is not available: %s", exc)
+                lock, acquired = None, False
+
+            try:
+                entry = self._read()
+
+                if not (self._is_fresh(entry) and entry["token"] != stale_token):
+                    entry = self._login(login)
+
+                self._entry = entry
+                return entry["token"]
+
+            finally:
+                if acquired:
+                    try:
+                        lock.release()
+                    except Exception as exc:
+                        logger.warning("The token lock is lost: %s", exc)
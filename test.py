@@ -1,91 +1,148 @@
-# from backend.modules.derms import PCSBattery
-
-# load = {
-#     1: 320,
-#     2: 310,
-#     3: 430,
-#     4: 370,
-#     5: 420,
-#     6: 430,
-#     7: 310,
-#     8: 310,
-#     9: 270,
-#     10: 350,
-#     11: 240,
-#     12: 510,
-#     13: 510,
-#     14: 220,
-#     15: 500,
-#     16: 420,
-#     17: 470,
-#     18: 195,
-#     19: 610,
-#     20: 605,
-#     21: 580,
-#     22: 570,
-#     23: 355,
-#     24: 330,
-# }
-
-
-# battery_features = {
-#     "soc_max": 1000,
-#     "soc_min_coef": 0.1,
-#     "soc_available": 1000,
-#     "p_max": 500,
-#     "p_charge_max": 120,
-#     "feeder_max": 600,
-#     "charging_margin": 160,
-#     "first_chargingـtimes_st": 1,
-#     "first_chargingـtimes_et": 10,
-#     "second_chargingـtimes_st": 23,
-#     "second_chargingـtimes_et": 24,
-# }
-
-# programs = [
-#     {
-#         "name": "GA",
-#         "start": 15,
-#         "end": 16,
-#         "activator": True,
-#         "coef": 3,
-#     },
-#     {
-#         "name": "DR",
-#         "start": 13,
-#         "end": 15,
-#         "activator": False,
-#         "coef": 4,
-#     },
-#     {
-#         "name": "HOEP",
-#         "start": 17,
-#         "end": 19,
-#         "activator": False,
-#         "coef": 5,
-#     },
-#     {
-#         "name": "first_rp_coef",
-#         "start": 18,
-#         "end": 18,
-#         "activator": False,
-#         "coef": 1,
-#     },
-#     {
-#         "name": "second_rp_coef",
-#         "start": 19,
-#         "end": 20,
-#         "activator": False,
-#         "coef": 2,
-#     },
-# ]
-
-# pcs_battery = PCSBattery(load=load, battery_features=battery_features, programs=programs)
-# pcs_battery.calculate_pcs_battery_consumption()
-# # print(pcs_battery.model.Pbch.get_values())
-# print(pcs_battery.model.Pbdch.get_values())
-# # print(pcs_battery.model.soc.get_values())
-
-from backend.tasks.utils import calculate_pcs_battery_consumption
-
-calculate_pcs_battery_consumption(comp_id=123, battery_id=1)
+"""
+Parity check of the PCS backends on the sample inputs: the sparse-matrix model
+(HiGHS) must reach the same objective as the pyomo model solved by GLPK (see
+solvers.py), with one program, with overlapping programs and on a rolling horizon.
+"""
+import math
+import sys
+
+from pyomo.environ import SolverFactory
+
+from backend.modules.derms import PCSBattery, PCSBatteryMILP, settings, solvers
+
+if not SolverFactory("glpk").available(exception_flag=False):
+    print("GLPK is not available, the parity check is skipped")
+    sys.exit(0)
+
+# the pyomo side is pinned to GLPK (HiGHS is preferred by default)
+settings.PCS_SOLVERS = ("glpk",)
+solvers._solver_name = None
+
+load = {
+    1: 320,
+    2: 310,
+    3: 430,
+    4: 370,
+    5: 420,
+    6: 430,
+    7: 310,
+    8: 310,
+    9: 270,
+    10: 350,
+    11: 240,
+    12: 510,
+    13: 510,
+    14: 220,
+    15: 500,
+    16: 420,
+    17: 470,
+    18: 195,
+    19: 610,
+    20: 605,
+    21: 580,
+    22: 570,
+    23: 355,
+    24: 330,
+}
+
+
+battery_features = {
+    "soc_max": 1000,
+    "soc_min_coef": 0.1,
+    "soc_available": 1000,
+    "p_max": 500,
+    "p_charge_max": 120,
+    "feeder_max": 600,
+    "charging_margin": 160,
+    "first_chargingـtimes_st": 1,
+    "first_chargingـtimes_et": 10,
+    "second_chargingـtimes_st": 23,
+    "second_chargingـtimes_et": 24,
+}
+
+programs = [
+    {
+        "name": "GA",
+        "start": 15,
+        "end": 16,
+        "activator": True,
+        "coef": 3,
+    },
+    {
+        "name": "DR",
+        "start": 13,
+        "end": 15,
+        "activator": False,
+        "coef": 4,
+    },
+    {
+        "name": "HOEP",
+        "start": 17,
+        "end": 19,
+        "activator": False,
+        "coef": 5,
+    },
+    {
+        "name": "first_rp_coef",
+        "start": 18,
+        "end": 18,
+        "activator": False,
+        "coef": 1,
+    },
+    {
+        "name": "second_rp_coef",
+        "start": 19,
+        "end": 20,
+        "activator": False,
+        "coef": 2,
+    },
+]
+
+# GA, DR, HOEP and the second reserve program are active and overlap at 15 and 19
+overlapping_programs = [
+    {**program, "activator": program["name"] != "first_rp_coef"} for program in programs
+]
+
+
+def check(name: str, programs: list, executed: dict = None) -> PCSBatteryMILP:
+    """Solve the schedule by both backends and compare their objectives."""
+
+    pcs_battery = PCSBattery(load=load, battery_features=battery_features, programs=programs)
+    pcs_battery_milp = PCSBatteryMILP(load=load, battery_features=battery_features, programs=programs)
+
+    if executed:
+        pcs_battery.update(executed=executed)
+        pcs_battery_milp.update(executed=executed)
+
+    pcs_battery.calculate_pcs_battery_consumption()
+    pcs_battery_milp.calculate_pcs_battery_consumption()
+
+    print(name, pcs_battery.objective, pcs_battery_milp.objective)
+    assert math.isclose(pcs_battery.objective, pcs_battery_milp.objective, rel_tol=1e-6, abs_tol=1e-6)
+
+    # the executed times are kept as they are
+    for t, item in (executed or {}).items():
+        for battery in (pcs_battery, pcs_battery_milp):
+            assert math.isclose(battery.soc[t - 1], item["soc"], abs_tol=1e-6)
+            assert math.isclose(battery.p_discharge[t - 1], item["p_discharge"], abs_tol=1e-6)
+
+    return pcs_battery_milp
+
+
+check("single program", programs)
+full_day = check("overlapping programs", overlapping_programs)
+
+# rescheduled at 14:00, the hours 1..14 are already executed
+executed = {
+    t: {
+        "p_charge": float(full_day.p_charge[t - 1]),
+        "p_discharge": float(full_day.p_discharge[t - 1]),
+        "soc": float(full_day.soc[t - 1]),
+    }
+    for t in range(1, 15)
+}
+check("rolling horizon", overlapping_programs, executed=executed)
+
+# from backend.tasks.utils import calculate_pcs_battery_consumption
+
+# calculate_pcs_battery_consumption(comp_id=123, battery_id=1)
@@ -0,0 +1,42 @@
+"""
+Regression check of the per-day queries: the day window of ``on_day`` must search
+the index of the datetime column (EXPLAIN QUERY PLAN on an in-memory SQLite
+database), the ``func.date(column) == day`` form which it replaced scans the table.
+"""
+import datetime
+
+from sqlalchemy import create_engine, func, select, text
+
+from backend.database import on_day, on_days
+from backend.models import Load, Result
+
+engine = create_engine("sqlite://")
+day = datetime.date(2024, 1, 1)
+
+
+def query_plan(statement) -> str:
+    """Get the EXPLAIN QUERY PLAN of a statement (its parameters inlined)."""
+
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        return " ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+with engine.begin() as connection:
+    for model in (Load, Result):
+        model.__table__.create(connection)
+
+for model in (Load, Result):
+    columns = model.__table__.c
+
+    plan = query_plan(select(columns.id).where(on_day(columns.datetime, day)))
+    print(model.__tablename__, "on_day:", plan)
+    assert "SEARCH" in plan and "USING" in plan and "INDEX" in plan, plan
+
+    plan = query_plan(select(columns.id).where(on_days(columns.datetime, day, day + datetime.timedelta(days=30))))
+    print(model.__tablename__, "on_days:", plan)
+    assert "SEARCH" in plan and "INDEX" in plan, plan
+
+    plan = query_plan(select(columns.id).where(func.date(columns.datetime) == day))
+    print(model.__tablename__, "func.date:", plan)
+    assert "SEARCH" not in plan, plan
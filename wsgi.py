@@ -1,6 +1,7 @@
 from backend.app import create_app
 from backend.extensions import scheduler
 from backend.tasks.cbiot import battery_details, handle_soc_min, power_command, voltage_current
+from backend.tasks.dispatch import fleet_dispatch
 from backend.tasks.inputs import get_dr_status, get_ga_status, get_loads
 
 app = create_app()
@@ -14,5 +15,7 @@ scheduler.add_job(id="HANDLE_SOC_MIN", func=handle_soc_min, trigger="cron", minu
 scheduler.add_job(id="POWER_COMMAND", func=power_command, trigger="cron", minute="*/5")
 scheduler.add_job(id="VOLTAGE_CURRENT", func=voltage_current, trigger="cron", minute="*/15")
 
+scheduler.add_job(id="FLEET_DISPATCH", func=fleet_dispatch, trigger="cron", minute=0)
+
 with app.app_context():
     scheduler.start()